@@ -59,6 +59,20 @@ class FileContextLoader:
             PermissionError: If the file cannot be read.
             ValueError: If the file is binary or too large.
         """
+        file_context = await self._load_file(path)
+
+        # Store in dictionary
+        self.files[file_context.path] = file_context
+
+        return file_context
+
+    async def _load_file(self, path: str) -> FileContext:
+        """
+        Read a file into a FileContext without storing it.
+
+        Shared by add_file and add_glob, so that add_glob can load files
+        concurrently and still store them in match order.
+        """
         # Convert to absolute path (fast, no I/O)
         abs_path = os.path.abspath(path)
 
@@ -85,7 +99,7 @@ class FileContextLoader:
         line_count = content.count('\n') + (1 if content and not content.endswith('\n') else 0)
 
         # Create FileContext
-        file_context = FileContext(
+        return FileContext(
             path=abs_path,
             content=content,
             last_modified=last_modified,
@@ -93,11 +107,6 @@ class FileContextLoader:
             line_count=line_count
         )
 
-        # Store in dictionary
-        self.files[abs_path] = file_context
-
-        return file_context
-
     def _read_file_sync(self, abs_path: str, original_path: str) -> str:
         """
         Synchronous helper for file read operation.
@@ -116,8 +125,10 @@ class FileContextLoader:
         """
         Add files matching a glob pattern to the context asynchronously.
         
-        Files are added sequentially to maintain predictable behavior.
-        Consider using asyncio.gather() for concurrent loading if needed.
+        Files are read concurrently, then stored in the order the glob
+        returned them so the prompt layout stays predictable. Every file
+        that was read successfully is stored, even if another read fails
+        with an unexpected error; that error is re-raised afterwards.
 
         Args:
             pattern: Glob pattern (e.g., "*.py", "src/**/*.js").
@@ -141,17 +152,29 @@ class FileContextLoader:
         if not matched_files:
             raise ValueError(f"No files match pattern: {pattern}")
 
+        # Read all files concurrently; each read runs in the thread pool
+        results = await asyncio.gather(
+            *(self._load_file(file_path) for file_path in matched_files),
+            return_exceptions=True
+        )
+
         added_contexts = []
         errors = []
-
-        # Process files sequentially to avoid overwhelming the thread pool
-        # TODO: Consider asyncio.gather() for concurrent loading if performance is needed
-        for file_path in matched_files:
-            try:
-                context = await self.add_file(file_path)
-                added_contexts.append(context)
-            except (ValueError, PermissionError) as e:
-                errors.append(str(e))
+        unexpected = None
+
+        for result in results:
+            if isinstance(result, (ValueError, PermissionError)):
+                errors.append(str(result))
+            elif isinstance(result, BaseException):
+                # Keep storing the other files before re-raising
+                if unexpected is None:
+                    unexpected = result
+            else:
+                self.files[result.path] = result
+                added_contexts.append(result)
+
+        if unexpected is not None:
+            raise unexpected
 
         if not added_contexts and errors:
             raise ValueError(f"Could not add any files: {'; '.join(errors)}")
@@ -218,35 +241,50 @@ class FileContextLoader:
         """
         Re-read files that have been modified since last load asynchronously.
         
-        All file system checks are performed in a thread pool to avoid blocking.
+        Modification times for all loaded files are collected in a single
+        thread pool call, with one stat per file.
 
         Returns:
             List of paths that were updated.
         """
         updated_paths = []
 
+        # Stat every loaded file in one thread hop (blocking I/O)
+        mtimes = await asyncio.to_thread(self._stat_mtimes, list(self.files))
+
         for path, file_context in list(self.files.items()):
-            try:
-                # Check if file still exists (blocking I/O)
-                exists = await asyncio.to_thread(os.path.exists, path)
-                if not exists:
-                    # File was deleted, remove from context
-                    del self.files[path]
-                    continue
+            current_mtime = mtimes.get(path)
+            if current_mtime is None:
+                # File was deleted or can't be stat'ed, remove from context
+                del self.files[path]
+                continue
 
-                # Check if file was modified (blocking I/O)
-                current_mtime = await asyncio.to_thread(os.path.getmtime, path)
-                if current_mtime > file_context.last_modified:
+            if current_mtime > file_context.last_modified:
+                try:
                     # Re-read the file asynchronously
                     await self.add_file(path)
                     updated_paths.append(path)
-
-            except (ValueError, PermissionError, FileNotFoundError):
-                # If we can't read the file anymore, remove it from context
-                del self.files[path]
+                except (ValueError, PermissionError, FileNotFoundError):
+                    # If we can't read the file anymore, remove it from context
+                    del self.files[path]
 
         return updated_paths
 
+    @staticmethod
+    def _stat_mtimes(paths: List[str]) -> Dict[str, float]:
+        """
+        Synchronous helper returning the mtime of each path that can be stat'ed.
+
+        Paths that no longer exist or can't be accessed are left out.
+        """
+        mtimes = {}
+        for path in paths:
+            try:
+                mtimes[path] = os.stat(path).st_mtime
+            except OSError:
+                pass
+        return mtimes
+
     def get_total_size(self) -> int:
         """
         Get total size of all loaded file contents.
@@ -12,6 +12,7 @@ This module provides async client management for MCP servers, including:
 import asyncio
 import logging
 import os
+import sys
 from typing import Dict, List, Optional, Any
 from pathlib import Path
 import yaml
@@ -217,7 +218,8 @@ class MCPConnection:
         
         Format: mcp_{server_name}_{tool_name}
         """
-        return f"mcp_{self.config.name}_{tool_name}"
+        # Interned since the name keys every MCP tool lookup
+        return sys.intern(f"mcp_{self.config.name}_{tool_name}")
         
     def get_tool_schemas(self) -> List[Dict[str, Any]]:
         """
@@ -295,6 +297,23 @@ class MCPConnection:
         return self.tools
 
 
+class MCPToolEntry:
+    """A tool offered by a connected MCP server."""
+    
+    __slots__ = ("server", "description", "tool")
+    
+    # Distinguishes MCP entries from local Tool objects in merged tool maps
+    type = "mcp"
+    
+    def __init__(self, server: str, description: str, tool: Any):
+        self.server = server
+        self.description = description
+        self.tool = tool
+        
+    def __repr__(self):
+        return f"MCPToolEntry(server={self.server!r}, description={self.description!r})"
+
+
 class MCPManager:
     """Manages multiple MCP server connections."""
     
@@ -302,13 +321,17 @@ class MCPManager:
         self.config_path = Path(config_path)
         self.servers: Dict[str, MCPServerConfig] = {}
         self.connections: Dict[str, MCPConnection] = {}
-        self.logger = logging.getLogger(__name__)
         self._connection_locks: Dict[str, asyncio.Lock] = {}
+        # Entries for tools on connected servers by namespaced name, rebuilt
+        # only when servers connect or disconnect
+        self._tool_entries: Dict[str, MCPToolEntry] = {}
+        # Bumped whenever the set of available tools changes, so callers can cache
+        self.version = 0
         
     def load_config(self):
         """Load server configurations from YAML file with validation."""
         if not self.config_path.exists():
-            self.logger.warning(f"MCP config file not found: {self.config_path}")
+            logger.warning(f"MCP config file not found: {self.config_path}")
             return
             
         try:
@@ -317,28 +340,28 @@ class MCPManager:
                 
             # Validate config structure
             if not isinstance(config_data, dict):
-                self.logger.error("MCP config must be a dictionary")
+                logger.error("MCP config must be a dictionary")
                 return
                 
             if 'servers' not in config_data:
-                self.logger.warning("No servers defined in MCP config")
+                logger.warning("No servers defined in MCP config")
                 return
                 
             if not isinstance(config_data['servers'], dict):
-                self.logger.error("MCP config 'servers' must be a dictionary")
+                logger.error("MCP config 'servers' must be a dictionary")
                 return
                 
             self.servers = {}
             for name, server_config in config_data['servers'].items():
                 if not isinstance(server_config, dict):
-                    self.logger.warning(f"Skipping invalid server config for '{name}'")
+                    logger.warning(f"Skipping invalid server config for '{name}'")
                     continue
                 self.servers[name] = MCPServerConfig(name, server_config)
                 
-            self.logger.info(f"Loaded {len(self.servers)} MCP server configurations")
+            logger.info(f"Loaded {len(self.servers)} MCP server configurations")
             
         except Exception as e:
-            self.logger.error(f"Error loading MCP config: {e}", exc_info=True)
+            logger.error(f"Error loading MCP config: {e}", exc_info=True)
             
     async def connect_autoconnect_servers(self):
         """Connect to all servers marked with autoconnect=true."""
@@ -360,7 +383,7 @@ class MCPManager:
             True if successful, False otherwise
         """
         if name not in self.servers:
-            self.logger.error(f"Server {name} not found in config")
+            logger.error(f"Server {name} not found in config")
             return False
         
         # Get or create lock for this server
@@ -370,7 +393,7 @@ class MCPManager:
         # Prevent concurrent connection attempts to the same server
         async with self._connection_locks[name]:
             if name in self.connections and self.connections[name].connected:
-                self.logger.info(f"Server {name} already connected")
+                logger.info(f"Server {name} already connected")
                 return True
                 
             config = self.servers[name]
@@ -379,6 +402,7 @@ class MCPManager:
             success = await connection.connect()
             if success:
                 self.connections[name] = connection
+                self._refresh_tool_entries()
                 
             return success
         
@@ -393,12 +417,13 @@ class MCPManager:
             True if successful, False otherwise
         """
         if name not in self.connections:
-            self.logger.warning(f"Server {name} not connected")
+            logger.warning(f"Server {name} not connected")
             return True
             
         success = await self.connections[name].disconnect()
         if success:
             del self.connections[name]
+            self._refresh_tool_entries()
             
         return success
         
@@ -417,7 +442,7 @@ class MCPManager:
         # Disconnect servers that are no longer in config
         for name in list(self.connections.keys()):
             if name not in self.servers:
-                self.logger.info(f"Server {name} removed from config, disconnecting")
+                logger.info(f"Server {name} removed from config, disconnecting")
                 await self.disconnect_server(name)
                 
         # Reconnect servers that changed or are new autoconnect servers
@@ -451,7 +476,7 @@ class MCPManager:
             
         return status_list
         
-    def get_all_tools(self, server_filter: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
+    def get_all_tools(self, server_filter: Optional[str] = None) -> Dict[str, MCPToolEntry]:
         """
         Get all available tools from connected servers.
         
@@ -459,25 +484,40 @@ class MCPManager:
             server_filter: Optional server name to filter by
             
         Returns:
-            Dictionary mapping tool names to tool info
+            Dictionary mapping tool names to MCPToolEntry records
         """
-        all_tools = {}
+        if not server_filter:
+            return dict(self._tool_entries)
+        return {
+            tool_name: entry
+            for tool_name, entry in self._tool_entries.items()
+            if entry.server == server_filter
+        }
+        
+    def _refresh_tool_entries(self):
+        """Rebuild the tool entries offered by connected servers."""
+        self._tool_entries = {
+            tool_name: MCPToolEntry(name, tool.description, tool)
+            for name, connection in self.connections.items() if connection.connected
+            for tool_name, tool in connection.tools.items()
+        }
+        self.version += 1
+        
+    def has_tool(self, tool_name: str) -> bool:
+        """Return True if a connected server offers the namespaced tool."""
+        return tool_name in self._tool_entries
+        
+    def get_tool(self, tool_name: str) -> Optional[MCPToolEntry]:
+        """
+        Get a single tool without building the full tool map.
         
-        for name, connection in self.connections.items():
-            if not connection.connected:
-                continue
-                
-            if server_filter and name != server_filter:
-                continue
-                
-            for tool_name, tool in connection.tools.items():
-                all_tools[tool_name] = {
-                    "server": name,
-                    "description": tool.description,
-                    "tool": tool
-                }
-                
-        return all_tools
+        Args:
+            tool_name: Namespaced tool name (mcp_{server}_{tool})
+            
+        Returns:
+            The tool's MCPToolEntry, or None
+        """
+        return self._tool_entries.get(tool_name)
         
     def get_tool_schemas(self) -> List[Dict[str, Any]]:
         """
@@ -332,8 +332,8 @@ class Repl:
         Handle tool calls from the LLM asynchronously.
         
         Executes tools requested by the LLM and sends results back
-        for final response generation. Tool execution happens in the
-        current async context (tools are synchronous but fast).
+        for final response generation. All calls from one turn run
+        concurrently; results are recorded in the order they were requested.
         
         Args:
             message: Assistant message containing tool calls
@@ -356,23 +356,23 @@ class Repl:
             ]
         })
 
-        # Execute each tool call
-        # MCP tools are async, so we need to await them
+        # Display each tool call
+        calls = []
         for tool_call in message.tool_calls:
             tool_name = tool_call.function.name
             tool_args = tool_call.function.arguments
+            calls.append((tool_name, tool_args))
 
-            # Display tool call
             self.print_status(f"[bold blue]🔧 Tool Call:[/bold blue] [cyan]{tool_name}[/cyan]")
             self.logger.info(f"Tool call: {tool_name} with args: {tool_args}")
 
-            # Execute tool (now async to support MCP tools)
-            result = await self.session.execute_tool(tool_name, tool_args)
+        # Execute all tool calls concurrently
+        results = await self.session.execute_tools_batch(calls)
 
+        for tool_call, result in zip(message.tool_calls, results):
             # Display result
-            
             self.print_status(f"[bold green]✔ Tool Result:[/bold green] {result}")
-            self.logger.info(f"Tool result for {tool_name}: {result}")
+            self.logger.info(f"Tool result for {tool_call.function.name}: {result}")
 
             # Add tool result to history
             self.session.history.append({
@@ -654,7 +654,7 @@ class Repl:
 
     async def cmd_clear(self, args):
         """Clear all messages and file context for a fresh start."""
-        self.session.history.clear()
+        self.session.clear_history()
         self.session.file_context.clear()
         self.print_status("[bold green]✔ Cleared:[/bold green] All messages and file context removed. New prompts will start fresh.")
 
@@ -849,7 +849,7 @@ class Repl:
         # Group by server
         by_server = {}
         for tool_name, tool_info in all_tools.items():
-            server = tool_info["server"]
+            server = tool_info.server
             if server not in by_server:
                 by_server[server] = []
             by_server[server].append((tool_name, tool_info))
@@ -858,7 +858,7 @@ class Repl:
             text.append(f"[{server}]\n", style="bold cyan")
             for tool_name, tool_info in tools:
                 text.append(f"  • {tool_name}\n", style="cyan")
-                text.append(f"    {tool_info['description']}\n", style="dim")
+                text.append(f"    {tool_info.description}\n", style="dim")
             text.append("\n")
             
         self.console.print(Panel(text, title="MCP Tools", border_style="blue"))
@@ -2,5 +2,7 @@
 set -e
 
 echo "Running tests..."
-pytest -v --no-header --tb=short
+# Spread tests across CPU cores; each worker runs whole modules so
+# module-scoped fixtures are built once per worker
+pytest -v --no-header --tb=short -n auto --dist loadscope
 echo "Tests completed successfully."
@@ -9,6 +9,9 @@ from openai import AsyncOpenAI
 from file_context_loader import FileContextLoader
 from tool_registry import ToolRegistry
 from mcp_manager import MCPManager
+import tools
+
+logger = logging.getLogger(__name__)
 
 class Session:
     # Temperature presets
@@ -104,6 +107,10 @@ class Session:
         if len(self.history) > self.max_history:
             self.history = self.history[-self.max_history:]
 
+    def clear_history(self):
+        """Remove all messages from history, reusing the existing list."""
+        self.history.clear()
+
     def get_messages(self):
         """Build messages list with system prompt, file context, and history."""
         # Start with system instruction
@@ -141,6 +148,18 @@ class Session:
         """
         return await self.tool_registry.execute_tool(tool_name, arguments)
 
+    async def execute_tools_batch(self, calls):
+        """
+        Execute several tool calls concurrently.
+
+        Args:
+            calls: (tool_name, arguments) pairs
+
+        Returns:
+            Tool execution results as strings, in the same order as calls
+        """
+        return await self.tool_registry.execute_tools_batch(calls)
+
     def list_tools(self):
         """List all available tools (local + MCP)."""
         return self.tool_registry.list_tools()
@@ -174,9 +193,9 @@ class Session:
         try:
             # Use asyncio to write file in thread pool (file I/O is blocking)
             await asyncio.to_thread(self._save_session_sync, file_path)
-            logging.getLogger(__name__).debug(f"Session saved to {file_path}")
+            logger.debug(f"Session saved to {file_path}")
         except Exception as e:
-            logging.getLogger(__name__).error(f"Failed to save session: {e}", exc_info=True)
+            logger.error(f"Failed to save session: {e}", exc_info=True)
             raise
 
         return self.session_name
@@ -186,8 +205,16 @@ class Session:
         Synchronous helper for file write operation.
         
         This is executed in a thread pool to avoid blocking the event loop.
+        Uses orjson when installed, which encodes straight to bytes. Both
+        paths write equivalent indented UTF-8 JSON; orjson leaves non-ASCII
+        characters unescaped where json.dump escapes them.
         """
-        with open(file_path, 'w') as f:
+        orjson = tools.orjson
+        if orjson is not None:
+            with open(file_path, 'wb') as f:
+                f.write(orjson.dumps(self.history, option=orjson.OPT_INDENT_2))
+            return
+        with open(file_path, 'w', encoding='utf-8') as f:
             json.dump(self.history, f, indent=2)
 
     async def load_session(self, name: str = None):
@@ -207,8 +234,6 @@ class Session:
             FileNotFoundError: If no sessions exist or the named session doesn't exist.
             json.JSONDecodeError: If session file is corrupted
         """
-        logger = logging.getLogger(__name__)
-        
         if not name:
             # Find most recent - use thread pool for blocking file I/O
             files = await asyncio.to_thread(glob.glob, os.path.join(self.sessions_dir, "*.json"))
@@ -241,8 +266,13 @@ class Session:
         Synchronous helper for file read operation.
         
         This is executed in a thread pool to avoid blocking the event loop.
+        orjson.JSONDecodeError subclasses json.JSONDecodeError, so callers
+        see the same exception either way.
         """
-        with open(file_path, 'r') as f:
+        if tools.orjson is not None:
+            with open(file_path, 'rb') as f:
+                return tools.orjson.loads(f.read())
+        with open(file_path, 'r', encoding='utf-8') as f:
             return json.load(f)
 
     def list_sessions(self):
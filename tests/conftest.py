@@ -0,0 +1,138 @@
+import configparser
+import logging
+from unittest.mock import patch
+import pytest
+from main import load_config
+from repl import Repl
+from session import Session
+from tool_registry import ToolRegistry
+import tools
+
+
+# DEFAULT section every test config starts from
+TEST_DEFAULTS = {"api_key": "test-key"}
+
+
+def _make_config(**overrides):
+    """
+    Build a ConfigParser from DEFAULT overrides with the test API key set.
+    Interpolation is disabled since no test value references another key.
+    """
+    config = configparser.ConfigParser(interpolation=None)
+    config.read_dict({"DEFAULT": {**TEST_DEFAULTS, **overrides}})
+    return config
+
+
+@pytest.fixture
+def config_factory():
+    """Return a callable that builds a ConfigParser from DEFAULT overrides."""
+    return _make_config
+
+
+@pytest.fixture(autouse=True)
+def _silence_logs(request):
+    """
+    Disable logging for tests that do not inspect log records, so tool and
+    REPL calls skip building records nobody reads. Tests that take caplog,
+    directly or through info_logs/debug_logs, keep logging enabled.
+    """
+    if "caplog" in request.fixturenames:
+        yield
+        return
+    logging.disable(logging.CRITICAL)
+    yield
+    logging.disable(logging.NOTSET)
+
+
+@pytest.fixture(params=["orjson", "stdlib"])
+def json_backend(request, monkeypatch):
+    """
+    Run the test once with orjson, skipped when it is not installed, and
+    once with tools.orjson cleared so the stdlib json fallback is used.
+    """
+    if request.param == "orjson":
+        pytest.importorskip("orjson")
+    else:
+        monkeypatch.setattr(tools, "orjson", None)
+    return request.param
+
+
+@pytest.fixture
+def info_logs(caplog):
+    """caplog capturing INFO and above for the whole test."""
+    caplog.set_level(logging.INFO)
+    return caplog
+
+
+@pytest.fixture
+def debug_logs(caplog):
+    """caplog capturing DEBUG and above for the whole test."""
+    caplog.set_level(logging.DEBUG)
+    return caplog
+
+
+@pytest.fixture(scope="session")
+def real_config():
+    """Parse the on-disk configuration once for the whole test session."""
+    return load_config()
+
+
+@pytest.fixture(scope="module")
+def base_config():
+    """
+    Config holding only the test API key, built once per module.
+    Session only reads its config, so sharing it cannot leak state; the
+    session fixture stays function-scoped for tests that mutate settings.
+    """
+    return _make_config()
+
+
+@pytest.fixture
+def session(base_config):
+    """Fresh Session built from base_config."""
+    return Session(base_config)
+
+
+@pytest.fixture
+def repl(session):
+    """Repl wrapping the session fixture."""
+    return Repl(session)
+
+
+@pytest.fixture
+def mocked_openai_session(base_config):
+    """
+    Yield (session, mock_client) with session.AsyncOpenAI patched while the
+    Session is built, so session.client is already the mock instance.
+    """
+    with patch('session.AsyncOpenAI') as MockAsyncOpenAI:
+        session = Session(base_config)
+        yield session, MockAsyncOpenAI.return_value
+
+
+@pytest.fixture(scope="module")
+def readonly_session(base_config):
+    """
+    Session shared by every test in a module. Only use it in tests that
+    never mutate the session; anything else takes the session fixture.
+    """
+    return Session(base_config)
+
+
+@pytest.fixture(scope="module")
+def readonly_registry():
+    """ToolRegistry without MCP shared by every test in a module that only reads it."""
+    return ToolRegistry()
+
+
+@pytest.fixture
+async def repl_with_file(repl, tmp_path, capsys):
+    """
+    Return (repl, path) after adding a three-line file to the REPL's context.
+    The /add output is checked and drained so tests only see their own output.
+    """
+    path = tmp_path / "test.txt"
+    path.write_text("Line 1\nLine 2\nLine 3")
+    await repl.handle_input(f"/add {path}")
+    assert "Added:" in capsys.readouterr().out
+    return repl, str(path)
@@ -1,20 +1,26 @@
-import configparser
+import functools
+import re
+from types import SimpleNamespace
 import pytest
 import pytest_asyncio
-from session import Session
-from repl import Repl
-import tempfile
 import os
 
-async def test_clear_command(capsys):
+@functools.lru_cache(maxsize=None)
+def _any_of(needles):
+    """Compile one alternation regex per distinct tuple of needles."""
+    return re.compile("|".join(map(re.escape, needles)))
+
+
+def contains_any(text, needles):
+    """Return True if any of the needles occurs in text, in a single scan."""
+    return _any_of(tuple(needles)).search(text) is not None
+
+
+async def test_clear_command(capsys, session, repl):
     """Test /clear command empties history and file context."""
-    mock_config = configparser.ConfigParser()
-    mock_config["DEFAULT"] = {"api_key": "test-key"}
-    session = Session(mock_config)
-    repl = Repl(session)
     # Add history and fake file context
     session.add_message("user", "hello")
-    session.file_context.files = [type("FakeFile", (), {"path": "foo.txt", "line_count": 1, "size": 10})()]
+    session.file_context.files = [SimpleNamespace(path="foo.txt", line_count=1, size=10)]
     assert len(session.history) == 1
     assert len(session.file_context.files) == 1
     await repl.handle_input("/clear")
@@ -24,124 +30,101 @@ async def test_clear_command(capsys):
 """Tests for command parameter parsing architecture."""
 
 
+@pytest.mark.parametrize("cmd,expect", [
+    ("/version", "bchat version 0.1.0"),
+    ("/help", "Available commands:"),
+    # Should show no sessions or list sessions
+    ("/history", ("No saved sessions", "Saved Sessions")),
+], ids=["version", "help", "history"])
 @pytest.mark.asyncio
-async def test_zero_param_commands(capsys):
+async def test_zero_param_commands(cmd, expect, capsys, repl):
     """Test commands that take no parameters."""
-    mock_config = configparser.ConfigParser()
-    mock_config["DEFAULT"] = {"api_key": "test-key"}
-    session = Session(mock_config)
-    repl = Repl(session)
-
-    # Test /version
-    await repl.handle_input("/version")
-    captured = capsys.readouterr()
-    assert "bchat version 0.1.0" in captured.out
-
-    # Test /help
-    await repl.handle_input("/help")
-    captured = capsys.readouterr()
-    assert "Available commands:" in captured.out
-
-    # Test /history
-    await repl.handle_input("/history")
-    captured = capsys.readouterr()
-    # Should show no sessions or list sessions
-    assert ("No saved sessions" in captured.out or "Saved Sessions" in captured.out)
+    await repl.handle_input(cmd)
+    out = capsys.readouterr().out
+    if isinstance(expect, tuple):
+        assert contains_any(out, expect)
+    else:
+        assert expect in out
 
 
 @pytest.mark.asyncio
-async def test_one_param_save_command(capsys):
+async def test_one_param_save_command(capsys, session, repl, tmp_path):
     """Test /save command with various parameter formats."""
-    mock_config = configparser.ConfigParser()
-    mock_config["DEFAULT"] = {"api_key": "test-key"}
+    temp_dir = str(tmp_path)
+    session.sessions_dir = temp_dir
     
-    with tempfile.TemporaryDirectory() as temp_dir:
-        session = Session(mock_config)
-        session.sessions_dir = temp_dir
-        repl = Repl(session)
-        
-        # Add some history
-        session.add_message("user", "test message")
-        
-        # Test save with simple name
-        await repl.handle_input("/save simple")
-        captured = capsys.readouterr()
-        assert "Saved:" in captured.out
-        assert "simple" in captured.out
-        assert os.path.exists(os.path.join(temp_dir, "simple.json"))
-        
-        # Reset session_name to test multi-word name
-        session.session_name = None
-        await repl.handle_input("/save my important session")
-        captured = capsys.readouterr()
-        assert "Saved:" in captured.out
-        assert "my important session" in captured.out
-        assert os.path.exists(os.path.join(temp_dir, "my important session.json"))
-        
-        # Test save without name (auto-generated) - clear session_name first
-        session.session_name = None
-        await repl.handle_input("/save")
-        captured = capsys.readouterr()
-        assert "Saved:" in captured.out
-        # Should save with auto-generated name containing "session_"
-        # The auto-generated name will be in the output
-        saved_files = os.listdir(temp_dir)
-        auto_generated = [f for f in saved_files if f.startswith("session_")]
-        assert len(auto_generated) > 0
+    # Add some history
+    session.add_message("user", "test message")
+    
+    # Test save with simple name
+    await repl.handle_input("/save simple")
+    captured = capsys.readouterr()
+    assert "Saved:" in captured.out
+    assert "simple" in captured.out
+    assert os.path.exists(os.path.join(temp_dir, "simple.json"))
+    
+    # Reset session_name to test multi-word name
+    session.session_name = None
+    await repl.handle_input("/save my important session")
+    captured = capsys.readouterr()
+    assert "Saved:" in captured.out
+    assert "my important session" in captured.out
+    assert os.path.exists(os.path.join(temp_dir, "my important session.json"))
+    
+    # Test save without name (auto-generated) - clear session_name first
+    session.session_name = None
+    await repl.handle_input("/save")
+    captured = capsys.readouterr()
+    assert "Saved:" in captured.out
+    # Should save with auto-generated name containing "session_"
+    # The auto-generated name will be in the output
+    saved_files = os.listdir(temp_dir)
+    auto_generated = [f for f in saved_files if f.startswith("session_")]
+    assert len(auto_generated) > 0
 
 
 @pytest.mark.asyncio
-async def test_one_param_load_command(capsys):
+async def test_one_param_load_command(capsys, session, repl, tmp_path):
     """Test /load command with various parameter formats."""
-    mock_config = configparser.ConfigParser()
-    mock_config["DEFAULT"] = {"api_key": "test-key"}
+    temp_dir = str(tmp_path)
+    session.sessions_dir = temp_dir
     
-    with tempfile.TemporaryDirectory() as temp_dir:
-        session = Session(mock_config)
-        session.sessions_dir = temp_dir
-        repl = Repl(session)
-        
-        # Create test sessions with multi-word names
-        session.add_message("user", "test1")
-        await session.save_session("my test session")
-        
-        session.history = []
-        session.add_message("user", "test2")
-        await session.save_session("another test")
-        
-        # Test load with simple name
-        session.history = []
-        await repl.handle_input("/load another test")
-        captured = capsys.readouterr()
-        assert "Loaded:" in captured.out
-        assert "another test" in captured.out
-        assert len(session.history) == 1
-        
-        # Test load with multi-word name
-        session.history = []
-        await repl.handle_input("/load my test session")
-        captured = capsys.readouterr()
-        assert "Loaded:" in captured.out
-        assert "my test session" in captured.out
-        assert len(session.history) == 1
-        
-        # Test load without name (loads most recent)
-        session.history = []
-        await repl.handle_input("/load")
-        captured = capsys.readouterr()
-        assert "Loaded:" in captured.out
-        # Should load one of the sessions
-        assert len(session.history) == 1
+    # Create test sessions with multi-word names
+    session.add_message("user", "test1")
+    await session.save_session("my test session")
+    
+    session.clear_history()
+    session.add_message("user", "test2")
+    await session.save_session("another test")
+    
+    # Test load with simple name
+    session.clear_history()
+    await repl.handle_input("/load another test")
+    captured = capsys.readouterr()
+    assert "Loaded:" in captured.out
+    assert "another test" in captured.out
+    assert len(session.history) == 1
+    
+    # Test load with multi-word name
+    session.clear_history()
+    await repl.handle_input("/load my test session")
+    captured = capsys.readouterr()
+    assert "Loaded:" in captured.out
+    assert "my test session" in captured.out
+    assert len(session.history) == 1
+    
+    # Test load without name (loads most recent)
+    session.clear_history()
+    await repl.handle_input("/load")
+    captured = capsys.readouterr()
+    assert "Loaded:" in captured.out
+    # Should load one of the sessions
+    assert len(session.history) == 1
 
 
 @pytest.mark.asyncio
-async def test_two_param_set_command(capsys):
+async def test_two_param_set_command(capsys, session, repl):
     """Test /set command with proper parameter splitting."""
-    mock_config = configparser.ConfigParser()
-    mock_config["DEFAULT"] = {"api_key": "test-key"}
-    session = Session(mock_config)
-    repl = Repl(session)
-
     # Test /set with numeric temperature
     await repl.handle_input("/set temp 0.9")
     captured = capsys.readouterr()
@@ -168,13 +151,8 @@ async def test_two_param_set_command(capsys):
 
 
 @pytest.mark.asyncio
-async def test_set_command_missing_parameters(capsys):
+async def test_set_command_missing_parameters(capsys, repl):
     """Test /set command validation with missing parameters."""
-    mock_config = configparser.ConfigParser()
-    mock_config["DEFAULT"] = {"api_key": "test-key"}
-    session = Session(mock_config)
-    repl = Repl(session)
-
     # Test /set with no parameters
     await repl.handle_input("/set")
     captured = capsys.readouterr()
@@ -188,13 +166,8 @@ async def test_set_command_missing_parameters(capsys):
 
 
 @pytest.mark.asyncio
-async def test_set_command_invalid_option(capsys):
+async def test_set_command_invalid_option(capsys, repl):
     """Test /set command with invalid option."""
-    mock_config = configparser.ConfigParser()
-    mock_config["DEFAULT"] = {"api_key": "test-key"}
-    session = Session(mock_config)
-    repl = Repl(session)
-
     # Test /set with invalid option
     await repl.handle_input("/set invalid value")
     captured = capsys.readouterr()
@@ -204,13 +177,8 @@ async def test_set_command_invalid_option(capsys):
 
 
 @pytest.mark.asyncio
-async def test_set_command_invalid_value(capsys):
+async def test_set_command_invalid_value(capsys, repl):
     """Test /set command with invalid value."""
-    mock_config = configparser.ConfigParser()
-    mock_config["DEFAULT"] = {"api_key": "test-key"}
-    session = Session(mock_config)
-    repl = Repl(session)
-
     # Test /set with invalid temperature value
     await repl.handle_input("/set temp invalid_number")
     captured = capsys.readouterr()
@@ -219,71 +187,80 @@ async def test_set_command_invalid_value(capsys):
 
 
 @pytest.mark.asyncio
-async def test_unknown_command(capsys):
-    """Test handling of unknown commands."""
-    mock_config = configparser.ConfigParser()
-    mock_config["DEFAULT"] = {"api_key": "test-key"}
-    session = Session(mock_config)
-    repl = Repl(session)
-
-    # Test unknown command
-    await repl.handle_input("/unknown")
+async def test_stateless_commands(capsys, repl):
+    """Test commands that leave no state behind, sharing a single Repl."""
+    for cmd, needle in [
+        ("/unknown", "/unknown"),
+        # Empty command (just /) should show unknown command
+        ("/", "Unknown command:"),
+    ]:
+        await repl.handle_input(cmd)
+        out = capsys.readouterr().out
+        assert "Unknown command:" in out
+        assert needle in out
+
+
+@pytest.mark.parametrize("cmd, markers", [
+    # Should show error since file doesn't exist
+    pytest.param("/add nonexistent.txt", ("Error:",), id="add-nonexistent"),
+    # Should warn that file is not in context
+    pytest.param("/remove somefile.txt", ("Warning:", "not in context"), id="remove-not-in-context"),
+])
+@pytest.mark.asyncio
+async def test_cmd_error_paths(capsys, repl, cmd, markers):
+    """Test /add and /remove treat the whole parameter as one value and report failures."""
+    await repl.handle_input(cmd)
     captured = capsys.readouterr()
-    assert "Unknown command:" in captured.out
-    assert "/unknown" in captured.out
+    assert contains_any(captured.out, markers)
 
 
 @pytest.mark.asyncio
-async def test_add_command_with_pattern(capsys):
-    """Test /add command treats entire parameter as single value."""
-    mock_config = configparser.ConfigParser()
-    mock_config["DEFAULT"] = {"api_key": "test-key"}
-    session = Session(mock_config)
-    repl = Repl(session)
-
-    # Test /add with simple file (will fail but tests parameter parsing)
-    await repl.handle_input("/add nonexistent.txt")
+async def test_command_parameter_parsing_edge_cases(capsys, session, repl, tmp_path):
+    """Test edge cases in command parameter parsing."""
+    temp_dir = str(tmp_path)
+    session.sessions_dir = temp_dir
+    
+    # Add history for saving
+    session.add_message("user", "test")
+    
+    # Test save with leading/trailing spaces
+    await repl.handle_input("/save   test with spaces   ")
     captured = capsys.readouterr()
-    # Should show error since file doesn't exist
-    assert "Error:" in captured.out
+    assert "Saved:" in captured.out
+    # The strip() in handle_input should handle this
 
 
 @pytest.mark.asyncio
-async def test_remove_command(capsys):
-    """Test /remove command treats entire parameter as single value."""
-    mock_config = configparser.ConfigParser()
-    mock_config["DEFAULT"] = {"api_key": "test-key"}
-    session = Session(mock_config)
-    repl = Repl(session)
-
-    # Test /remove (will warn that file not in context)
-    await repl.handle_input("/remove somefile.txt")
-    captured = capsys.readouterr()
-    assert "Warning:" in captured.out or "not in context" in captured.out.lower()
+async def test_context_commands(capsys, session, repl_with_file):
+    """Test /context, /refresh and /remove against one shared file."""
+    repl, path = repl_with_file
+    assert len(session.file_context.list_files()) == 1
+
+    await repl.handle_input("/context")
+    # Unmodified file should not be re-read
+    await repl.handle_input("/refresh")
+    await repl.handle_input(f"/remove {path}")
+
+    # Drain the capture buffer once for the whole scenario
+    out = capsys.readouterr().out
+    assert "1 file(s)" in out
+    assert "No files were modified" in out
+    assert "Removed:" in out
+    assert session.file_context.list_files() == []
 
 
 @pytest.mark.asyncio
-async def test_command_parameter_parsing_edge_cases(capsys):
-    """Test edge cases in command parameter parsing."""
-    mock_config = configparser.ConfigParser()
-    mock_config["DEFAULT"] = {"api_key": "test-key"}
-    
-    with tempfile.TemporaryDirectory() as temp_dir:
-        session = Session(mock_config)
-        session.sessions_dir = temp_dir
-        repl = Repl(session)
-        
-        # Add history for saving
-        session.add_message("user", "test")
-        
-        # Test save with leading/trailing spaces
-        await repl.handle_input("/save   test with spaces   ")
-        captured = capsys.readouterr()
-        assert "Saved:" in captured.out
-        # The strip() in handle_input should handle this
-        
-        # Test empty command (just /)
-        await repl.handle_input("/")
-        captured = capsys.readouterr()
-        # Should show unknown command
-        assert "Unknown command:" in captured.out
+async def test_refresh_command_detects_changes(capsys, session, repl_with_file):
+    """Test /refresh re-reads a file whose mtime moved forward."""
+    repl, path = repl_with_file
+
+    # Bump the mtime explicitly instead of sleeping for the clock to tick
+    with open(path, 'w') as f:
+        f.write("Modified")
+    st = os.stat(path)
+    os.utime(path, (st.st_atime, st.st_mtime + 10))
+
+    await repl.handle_input("/refresh")
+    captured = capsys.readouterr()
+    assert "Refreshed:" in captured.out
+    assert session.file_context.list_files()[0].content == "Modified"
@@ -1,28 +1,57 @@
 import asyncio
 import os
-import tempfile
+import threading
 import time
 import pytest
 import pytest_asyncio
 from file_context_loader import FileContextLoader, FileContext
 
+# Pre-encoded file bodies, written with a single write_bytes call each
+_CONTENT = [f"Content {i}".encode() for i in range(3)]
+
+# Payloads for the size tests, allocated once at import
+_1KB_X = "x" * 1000
+_100_X = "x" * 100
+_100_Y = "y" * 100
+_10_X = "x" * 10
+
+
+@pytest.fixture(scope="session")
+def canned_txt_file(tmp_path_factory):
+    """Write one read-only text file per test session for symlinking."""
+    path = tmp_path_factory.mktemp("canned") / "src.txt"
+    path.write_text("Canned content")
+    return path
+
+
+def write_files(directory, files):
+    """Write each name -> content pair under directory and return the paths.
+
+    Bytes content is written as-is; str content is written as text.
+    """
+    paths = []
+    for name, content in files.items():
+        path = directory / name
+        if isinstance(content, bytes):
+            path.write_bytes(content)
+        else:
+            path.write_text(content)
+        paths.append(path)
+    return paths
+
 
 @pytest.mark.asyncio
-async def test_add_single_file():
+async def test_add_single_file(tmp_path):
     """Test adding a single file to context."""
-    with tempfile.TemporaryDirectory() as temp_dir:
-        # Create a test file
-        test_file = os.path.join(temp_dir, "test.txt")
-        with open(test_file, 'w') as f:
-            f.write("Line 1\nLine 2\nLine 3")
+    test_file, = write_files(tmp_path, {"test.txt": "Line 1\nLine 2\nLine 3"})
 
-        loader = FileContextLoader()
-        context = await loader.add_file(test_file)
+    loader = FileContextLoader()
+    context = await loader.add_file(test_file)
 
-        assert context.path == os.path.abspath(test_file)
-        assert context.content == "Line 1\nLine 2\nLine 3"
-        assert context.line_count == 3
-        assert context.size == 20
+    assert context.path == os.path.abspath(test_file)
+    assert context.content == "Line 1\nLine 2\nLine 3"
+    assert context.line_count == 3
+    assert context.size == 20
 
 
 @pytest.mark.asyncio
@@ -34,49 +63,39 @@ async def test_add_file_not_found():
 
 
 @pytest.mark.asyncio
-async def test_add_binary_file():
+async def test_add_binary_file(tmp_path):
     """Test adding a binary file raises ValueError."""
-    with tempfile.TemporaryDirectory() as temp_dir:
-        # Create a binary file with non-UTF-8 bytes
-        test_file = os.path.join(temp_dir, "test.bin")
-        with open(test_file, 'wb') as f:
-            # Write bytes that will fail UTF-8 decoding
-            f.write(b'\x80\x81\x82\x83\x84\x85')
+    # Bytes that will fail UTF-8 decoding
+    test_file, = write_files(tmp_path, {"test.bin": b'\x80\x81\x82\x83\x84\x85'})
 
-        loader = FileContextLoader()
-        with pytest.raises(ValueError, match="Binary file not supported"):
-            await loader.add_file(test_file)
+    loader = FileContextLoader()
+    with pytest.raises(ValueError, match="Binary file not supported"):
+        await loader.add_file(test_file)
 
 
 @pytest.mark.asyncio
-async def test_add_file_too_large():
+async def test_add_file_too_large(tmp_path):
     """Test adding a file larger than max_size raises ValueError."""
-    with tempfile.TemporaryDirectory() as temp_dir:
-        test_file = os.path.join(temp_dir, "large.txt")
-        with open(test_file, 'w') as f:
-            f.write("x" * 1000)
+    test_file, = write_files(tmp_path, {"large.txt": _1KB_X})
 
-        loader = FileContextLoader(max_size=500)
-        with pytest.raises(ValueError, match="File too large"):
-            await loader.add_file(test_file)
+    loader = FileContextLoader(max_size=500)
+    with pytest.raises(ValueError, match="File too large"):
+        await loader.add_file(test_file)
 
 
 @pytest.mark.asyncio
-async def test_add_glob_pattern():
+async def test_add_glob_pattern(tmp_path, canned_txt_file):
     """Test adding files using glob pattern."""
-    with tempfile.TemporaryDirectory() as temp_dir:
-        # Create test files
-        for i in range(3):
-            test_file = os.path.join(temp_dir, f"test{i}.txt")
-            with open(test_file, 'w') as f:
-                f.write(f"Content {i}")
+    # Link test files to the canned file instead of writing each one
+    for i in range(3):
+        os.symlink(canned_txt_file, tmp_path / f"test{i}.txt")
 
-        loader = FileContextLoader()
-        pattern = os.path.join(temp_dir, "*.txt")
-        contexts = await loader.add_glob(pattern)
+    loader = FileContextLoader()
+    pattern = str(tmp_path / "*.txt")
+    contexts = await loader.add_glob(pattern)
 
-        assert len(contexts) == 3
-        assert all(isinstance(ctx, FileContext) for ctx in contexts)
+    assert len(contexts) == 3
+    assert all(isinstance(ctx, FileContext) for ctx in contexts)
 
 
 @pytest.mark.asyncio
@@ -88,62 +107,48 @@ async def test_add_glob_no_matches():
 
 
 @pytest.mark.asyncio
-async def test_remove_file():
+async def test_remove_file(tmp_path):
     """Test removing a file from context."""
-    with tempfile.TemporaryDirectory() as temp_dir:
-        test_file = os.path.join(temp_dir, "test.txt")
-        with open(test_file, 'w') as f:
-            f.write("Test content")
+    test_file, = write_files(tmp_path, {"test.txt": "Test content"})
 
-        loader = FileContextLoader()
-        await loader.add_file(test_file)
+    loader = FileContextLoader()
+    await loader.add_file(test_file)
 
-        # Remove the file
-        removed = loader.remove_file(test_file)
-        assert removed is True
+    # Remove the file
+    removed = loader.remove_file(test_file)
+    assert removed is True
 
-        # Try removing again
-        removed = loader.remove_file(test_file)
-        assert removed is False
+    # Try removing again
+    removed = loader.remove_file(test_file)
+    assert removed is False
 
 
 @pytest.mark.asyncio
-async def test_list_files():
+async def test_list_files(tmp_path):
     """Test listing all loaded files."""
-    with tempfile.TemporaryDirectory() as temp_dir:
-        # Create test files
-        files = []
-        for i in range(3):
-            test_file = os.path.join(temp_dir, f"test{i}.txt")
-            with open(test_file, 'w') as f:
-                f.write(f"Content {i}")
-            files.append(test_file)
+    files = write_files(tmp_path, {f"test{i}.txt": buf for i, buf in enumerate(_CONTENT)})
 
-        loader = FileContextLoader()
-        for f in files:
-            await loader.add_file(f)
+    loader = FileContextLoader()
+    await asyncio.gather(*(loader.add_file(f) for f in files))
 
-        loaded = loader.list_files()
-        assert len(loaded) == 3
-        assert all(isinstance(ctx, FileContext) for ctx in loaded)
+    loaded = loader.list_files()
+    assert len(loaded) == 3
+    assert all(isinstance(ctx, FileContext) for ctx in loaded)
 
 
 @pytest.mark.asyncio
-async def test_format_for_prompt():
+async def test_format_for_prompt(tmp_path):
     """Test formatting context string for AI."""
-    with tempfile.TemporaryDirectory() as temp_dir:
-        test_file = os.path.join(temp_dir, "test.py")
-        with open(test_file, 'w') as f:
-            f.write("def hello():\n    print('Hello')")
+    test_file, = write_files(tmp_path, {"test.py": "def hello():\n    print('Hello')"})
 
-        loader = FileContextLoader()
-        await loader.add_file(test_file)
+    loader = FileContextLoader()
+    await loader.add_file(test_file)
 
-        context_str = loader.format_for_prompt()
-        assert "### File:" in context_str
-        assert test_file in context_str
-        assert "```" in context_str
-        assert "def hello():" in context_str
+    context_str = loader.format_for_prompt()
+    assert "### File:" in context_str
+    assert str(test_file) in context_str
+    assert "```" in context_str
+    assert "def hello():" in context_str
 
 
 @pytest.mark.asyncio
@@ -155,107 +160,169 @@ async def test_format_for_prompt_empty():
 
 
 @pytest.mark.asyncio
-async def test_refresh_detects_changes():
+async def test_refresh_detects_changes(tmp_path):
     """Test refresh detects and updates modified files."""
-    with tempfile.TemporaryDirectory() as temp_dir:
-        test_file = os.path.join(temp_dir, "test.txt")
-        with open(test_file, 'w') as f:
-            f.write("Original content")
+    test_file, = write_files(tmp_path, {"test.txt": "Original content"})
 
-        loader = FileContextLoader()
-        await loader.add_file(test_file)
+    loader = FileContextLoader()
+    await loader.add_file(test_file)
 
-        # Modify the file
-        time.sleep(0.1)  # Ensure mtime changes
-        with open(test_file, 'w') as f:
-            f.write("Updated content")
+    # Modify the file and bump its mtime explicitly instead of sleeping
+    # until the filesystem timestamp ticks over
+    mtime = os.path.getmtime(test_file) + 1
+    test_file.write_text("Updated content")
+    os.utime(test_file, (mtime, mtime))
 
-        # Refresh should detect the change
-        updated = await loader.refresh()
-        assert len(updated) == 1
-        assert test_file in updated[0]
+    # Refresh should detect the change
+    updated = await loader.refresh()
+    assert len(updated) == 1
+    assert str(test_file) in updated[0]
 
-        # Check content was updated
-        files = loader.list_files()
-        assert files[0].content == "Updated content"
+    # Check content was updated
+    files = loader.list_files()
+    assert files[0].content == "Updated content"
 
 
 @pytest.mark.asyncio
-async def test_refresh_no_changes():
+async def test_refresh_no_changes(tmp_path):
     """Test refresh with no changes returns empty list."""
-    with tempfile.TemporaryDirectory() as temp_dir:
-        test_file = os.path.join(temp_dir, "test.txt")
-        with open(test_file, 'w') as f:
-            f.write("Content")
+    test_file, = write_files(tmp_path, {"test.txt": "Content"})
 
-        loader = FileContextLoader()
-        await loader.add_file(test_file)
+    loader = FileContextLoader()
+    await loader.add_file(test_file)
 
-        # Refresh without changes
-        updated = await loader.refresh()
-        assert len(updated) == 0
+    # Refresh without changes
+    updated = await loader.refresh()
+    assert len(updated) == 0
 
 
 @pytest.mark.asyncio
-async def test_get_total_size():
+async def test_get_total_size(tmp_path):
     """Test getting total size of loaded files."""
-    with tempfile.TemporaryDirectory() as temp_dir:
-        # Create test files with known sizes
-        for i in range(3):
-            test_file = os.path.join(temp_dir, f"test{i}.txt")
-            with open(test_file, 'w') as f:
-                f.write("x" * 10)  # 10 characters each
+    # Create test files with known sizes, 10 characters each
+    write_files(tmp_path, {f"test{i}.txt": _10_X for i in range(3)})
 
-        loader = FileContextLoader()
-        pattern = os.path.join(temp_dir, "*.txt")
-        await loader.add_glob(pattern)
+    loader = FileContextLoader()
+    pattern = str(tmp_path / "*.txt")
+    await loader.add_glob(pattern)
 
-        total_size = loader.get_total_size()
-        assert total_size == 30
+    total_size = loader.get_total_size()
+    assert total_size == 30
 
 
 @pytest.mark.asyncio
-async def test_get_total_lines():
+async def test_get_total_lines(tmp_path):
     """Test getting total line count of loaded files."""
-    with tempfile.TemporaryDirectory() as temp_dir:
-        # Create test files with known line counts
-        test_file1 = os.path.join(temp_dir, "test1.txt")
-        with open(test_file1, 'w') as f:
-            f.write("Line 1\nLine 2")
+    # Create test files with known line counts
+    test_file1, test_file2 = write_files(tmp_path, {
+        "test1.txt": "Line 1\nLine 2",
+        "test2.txt": "A\nB\nC",
+    })
 
-        test_file2 = os.path.join(temp_dir, "test2.txt")
-        with open(test_file2, 'w') as f:
-            f.write("A\nB\nC")
-
-        loader = FileContextLoader()
-        await loader.add_file(test_file1)
-        await loader.add_file(test_file2)
+    loader = FileContextLoader()
+    await asyncio.gather(loader.add_file(test_file1), loader.add_file(test_file2))
 
-        total_lines = loader.get_total_lines()
-        assert total_lines == 5
+    total_lines = loader.get_total_lines()
+    assert total_lines == 5
 
 
 @pytest.mark.asyncio
-async def test_context_respects_max_size():
+async def test_context_respects_max_size(tmp_path):
     """Test that context string respects max_size limit."""
-    with tempfile.TemporaryDirectory() as temp_dir:
-        # Create files that exceed max_size when combined
-        test_file1 = os.path.join(temp_dir, "test1.txt")
-        with open(test_file1, 'w') as f:
-            f.write("x" * 100)
-
-        test_file2 = os.path.join(temp_dir, "test2.txt")
-        with open(test_file2, 'w') as f:
-            f.write("y" * 100)
-
-        # max_size of 150 means only first file (100 chars) fits,
-        # second file would exceed it
-        loader = FileContextLoader(max_size=150)
-        await loader.add_file(test_file1)
-        await loader.add_file(test_file2)
-
-        context_str = loader.format_for_prompt()
-        # Should include first file content
-        assert "xxx" in context_str
-        # Should show truncation message for second file or not include it
-        assert "truncated" in context_str.lower() or "yyy" not in context_str
+    # Create files that exceed max_size when combined
+    test_file1, test_file2 = write_files(tmp_path, {
+        "test1.txt": _100_X,
+        "test2.txt": _100_Y,
+    })
+
+    # max_size of 150 means only first file (100 chars) fits,
+    # second file would exceed it
+    loader = FileContextLoader(max_size=150)
+    await loader.add_file(test_file1)
+    await loader.add_file(test_file2)
+
+    context_str = loader.format_for_prompt()
+    # Should include first file content
+    assert "xxx" in context_str
+    # Should show truncation message for second file or not include it
+    assert "truncated" in context_str.lower() or "yyy" not in context_str
+
+
+@pytest.mark.asyncio
+async def test_add_glob_is_concurrent(tmp_path, monkeypatch):
+    """Test add_glob reads matched files concurrently, keeping glob order."""
+    names = [f"test{i}.txt" for i in range(5)]
+    write_files(tmp_path, {name: name for name in names})
+
+    loader = FileContextLoader()
+    real_read = loader._read_file_sync
+    lock = threading.Lock()
+    in_flight = 0
+    max_in_flight = 0
+
+    def slow_read(abs_path, original_path):
+        nonlocal in_flight, max_in_flight
+        with lock:
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+        time.sleep(0.05)
+        with lock:
+            in_flight -= 1
+        return real_read(abs_path, original_path)
+
+    monkeypatch.setattr(loader, "_read_file_sync", slow_read)
+
+    contexts = await loader.add_glob(str(tmp_path / "*.txt"))
+
+    assert max_in_flight > 1
+    # Stored order follows the glob result, not completion order
+    assert [ctx.path for ctx in loader.list_files()] == [ctx.path for ctx in contexts]
+    assert sorted(ctx.content for ctx in contexts) == names
+
+
+@pytest.mark.asyncio
+async def test_add_glob_keeps_files_read_before_unexpected_error(tmp_path, monkeypatch):
+    """Test an unexpected read error is re-raised after the other files are stored."""
+    files = write_files(tmp_path, {f"test{i}.txt": buf for i, buf in enumerate(_CONTENT)})
+
+    loader = FileContextLoader()
+    real_load = loader._load_file
+
+    async def failing_load(file_path):
+        if file_path.endswith("test1.txt"):
+            raise OSError("disk error")
+        return await real_load(file_path)
+
+    monkeypatch.setattr(loader, "_load_file", failing_load)
+
+    with pytest.raises(OSError, match="disk error"):
+        await loader.add_glob(str(tmp_path / "*.txt"))
+
+    loaded = sorted(ctx.path for ctx in loader.list_files())
+    assert loaded == sorted(os.path.abspath(f) for f in (files[0], files[2]))
+
+
+@pytest.mark.asyncio
+async def test_refresh_stats_each_file_once(tmp_path, monkeypatch):
+    """Test refresh checks each loaded file with a single stat call."""
+    files = write_files(tmp_path, {f"test{i}.txt": _10_X for i in range(5)})
+
+    loader = FileContextLoader()
+    await asyncio.gather(*(loader.add_file(f) for f in files))
+    files[0].unlink()
+
+    real_stat = os.stat
+    stat_calls = []
+
+    def counting_stat(path, *args, **kwargs):
+        stat_calls.append(path)
+        return real_stat(path, *args, **kwargs)
+
+    monkeypatch.setattr(os, "stat", counting_stat)
+
+    updated = await loader.refresh()
+
+    assert updated == []
+    assert len(stat_calls) == len(files)
+    # Deleted file is dropped from context
+    assert len(loader.list_files()) == len(files) - 1
@@ -1,256 +1,255 @@
 import asyncio
 import configparser
-import logging
-import tempfile
+import io
+import json
 import os
-from unittest.mock import patch, MagicMock, AsyncMock
+import re
+import sys
+from types import SimpleNamespace
+from unittest.mock import patch, AsyncMock
 import pytest
 import pytest_asyncio
-from main import load_config, main, async_main
+from main import main, async_main
 from repl import Repl
 from session import Session
 
-def test_load_config():
+# Canned chat completion shared by the prompt tests; plain attribute bags are
+# all Repl reads, so no mock bookkeeping is needed.
+_AI_RESPONSE = SimpleNamespace(
+    choices=[SimpleNamespace(message=SimpleNamespace(content="AI Response", tool_calls=None))],
+    usage=SimpleNamespace(total_tokens=10),
+)
+
+# Tool instructions injected into each get_messages test session
+_TOOL_AWARENESS = "Use the available tools when helpful."
+
+async def _create_completion(*args, **kwargs):
+    """Stand-in for chat.completions.create returning the canned response."""
+    return _AI_RESPONSE
+
+def capture_stdout(monkeypatch):
+    """
+    Point sys.stdout at an in-memory buffer for the rest of a test.
+    Repl only writes through print() and a rich Console that resolves
+    sys.stdout lazily, so no file descriptor redirection is needed.
+    Call this from the test body: pytest reinstalls its own sys.stdout
+    capture between fixture setup and the test call.
+    """
+    buf = io.StringIO()
+    monkeypatch.setattr(sys, "stdout", buf)
+    return buf
+
+@pytest.fixture(scope="module", autouse=True)
+def mock_async_openai():
+    """
+    Patch session.AsyncOpenAI once for the whole module so no test here
+    builds a real client. Tests that need responses set session.client.
+    """
+    patcher = patch('session.AsyncOpenAI')
+    yield patcher.start()
+    patcher.stop()
+
+def test_load_config(real_config):
     """
     Happy Path test for load_config.
     Verifies that the configuration is loaded and contains the DEFAULT section.
     """
-    config = load_config()
-    assert isinstance(config, configparser.ConfigParser)
-    assert "DEFAULT" in config
+    assert isinstance(real_config, configparser.ConfigParser)
+    assert "DEFAULT" in real_config
 
-def test_main_initialization():
+@pytest.fixture
+def mocked_main(real_config):
     """
-    Happy Path test for main initialization.
-    Verifies that main initializes Session and Repl and calls run.
+    Patch main's collaborators so main() runs without a client or REPL loop.
+    Yields (MockSession, MockRepl, config) with the async teardown hooks wired.
+    Session and setup_logging are mocked, so the cached default config is
+    handed to main() as-is rather than re-read from disk.
     """
-    mock_config = configparser.ConfigParser()
-    mock_config["DEFAULT"] = {"api_key": "test-key"}
-
-    # Create an async mock for run()
-    async def mock_run():
-        pass
-    
-    # Create an async mock for client.close()
-    async def mock_close():
-        pass
-    
-    # Create an async mock for mcp_manager.cleanup()
-    async def mock_cleanup():
-        pass
-
-    with patch('main.load_config', return_value=mock_config), \
+    with patch('main.load_config', return_value=real_config), \
          patch('main.setup_logging'), \
          patch('main.Session') as MockSession, \
          patch('main.Repl') as MockRepl:
 
-        # Setup mock client with async close
-        mock_client = MagicMock()
-        mock_client.close = mock_close
-        
-        # Setup mock mcp_manager with async cleanup
-        mock_mcp_manager = MagicMock()
-        mock_mcp_manager.cleanup = mock_cleanup
-        mock_mcp_manager.load_config = MagicMock()
-        mock_mcp_manager.connect_autoconnect_servers = AsyncMock()
-        
-        MockSession.return_value.client = mock_client
-        MockSession.return_value.mcp_manager = mock_mcp_manager
-        
-        MockRepl.return_value.run = mock_run
-        main()
-
-        MockSession.assert_called_once()
-        MockRepl.assert_called_once()
-
+        mock_session_instance = MockSession.return_value
+        mock_session_instance.client.close = AsyncMock()
+        mock_session_instance.mcp_manager.cleanup = AsyncMock()
+        mock_session_instance.mcp_manager.connect_autoconnect_servers = AsyncMock()
+        MockRepl.return_value.run = AsyncMock()
+
+        yield MockSession, MockRepl, real_config
+
+@pytest.mark.parametrize("model, temperature, expected_logs", [
+    ("gpt-4o", 0.8, ["Session initialized with model: gpt-4o, temperature: 0.8"]),
+    ("gpt-4o-mini", 0.7, ["Application startup", "MCP servers initialized", "Application shutdown"]),
+], ids=["startup_settings", "lifecycle"])
+def test_main_startup(mocked_main, info_logs, model, temperature, expected_logs):
+    """
+    Happy Path test for main initialization.
+    Verifies that main initializes Session and Repl, runs the REPL, cleans up,
+    and logs the session settings.
+    """
+    MockSession, MockRepl, _ = mocked_main
+    MockSession.return_value.model = model
+    MockSession.return_value.temperature = temperature
+
+    main()
+
+    MockSession.assert_called_once()
+    MockRepl.assert_called_once()
+    MockRepl.return_value.run.assert_awaited_once()
+    MockSession.return_value.client.close.assert_awaited_once()
+    MockSession.return_value.mcp_manager.cleanup.assert_awaited_once()
+    for expected in expected_logs:
+        assert expected in info_logs.text
+
+@pytest.mark.parametrize("cmd, expected", [
+    pytest.param("/version", ["bchat version 0.1.0"], id="version"),
+    pytest.param("/help", ["Available commands:", "/version", "/add", "/remove", "/context", "/refresh"], id="help"),
+])
 @pytest.mark.asyncio
-async def test_repl_commands(capsys):
+async def test_repl_command_output(monkeypatch, repl, cmd, expected):
     """
-    Test REPL commands (/version, /help, /exit).
+    Test REPL commands print every expected marker.
     """
-    mock_config = configparser.ConfigParser()
-    mock_config["DEFAULT"] = {"api_key": "test-key"}
-    session = Session(mock_config)
-    repl = Repl(session)
-
-    # Test /version
-    await repl.handle_input("/version")
-    captured = capsys.readouterr()
-    assert "bchat version 0.1.0" in captured.out
+    stdout_buffer = capture_stdout(monkeypatch)
+    await repl.handle_input(cmd)
+    # One alternation pass over the output instead of a scan per marker
+    pattern = re.compile("|".join(map(re.escape, expected)))
+    assert set(pattern.findall(stdout_buffer.getvalue())) == set(expected)
 
-    # Test /help
-    await repl.handle_input("/help")
-    captured = capsys.readouterr()
-    assert "Available commands:" in captured.out
-    assert "/version" in captured.out
-
-    # Test /exit
+@pytest.mark.asyncio
+async def test_repl_exit(repl):
+    """
+    Test /exit leaves the REPL.
+    """
     with pytest.raises(SystemExit):
         await repl.handle_input("/exit")
 
 @pytest.mark.asyncio
-async def test_repl_prompt_handling(capsys, caplog):
+async def test_repl_prompt_handling(monkeypatch, debug_logs, config_factory):
     """
     Test REPL prompt handling (sending request to OpenAI).
     """
-    mock_config = configparser.ConfigParser()
-    mock_config["DEFAULT"] = {
-        "api_key": "test-key",
-        "system_instruction": "You are a helpful assistant."
-    }
-
-    # Mock AsyncOpenAI client in the session
-    with patch('session.AsyncOpenAI') as MockAsyncOpenAI:
-        # Setup mock response
-        mock_instance = MockAsyncOpenAI.return_value
-        
-        # Create an async mock for the create method
-        async def mock_create(*args, **kwargs):
-            mock_response = MagicMock()
-            mock_response.choices = [type('obj', (object,), {'message': type('obj', (object,), {'content': 'AI Response', 'tool_calls': None})})]
-            mock_response.usage = type('obj', (object,), {'total_tokens': 10})
-            return mock_response
-        
-        mock_instance.chat.completions.create = mock_create
-
-        # Create session
-        session = Session(mock_config)
-        session.client = mock_instance
-
-        repl = Repl(session)
-
-        # Set log level
-        caplog.set_level(logging.DEBUG)
-
-        # Send a prompt
-        await repl.handle_input("Hello AI")
-
-        captured = capsys.readouterr()
-
-        # Verify output
-        # Check for the response.
-        assert "AI Response" in captured.out
-
-        # Verify logs
-        assert "Request: Hello AI" in caplog.text
-
-def test_startup_logging(caplog):
-    """
-    Test that model and temperature are logged at startup.
-    """
-    mock_config = configparser.ConfigParser()
-    mock_config["DEFAULT"] = {
-        "api_key": "test-key",
-        "temperature": "0.8"
-    }
-
-    async def mock_run():
-        pass
-    
-    async def mock_close():
-        pass
-    
-    async def mock_cleanup():
-        pass
-
-    with patch('main.load_config', return_value=mock_config), \
-         patch('main.setup_logging'), \
-         patch('main.Session') as MockSession, \
-         patch('main.Repl') as MockRepl:
+    stdout_buffer = capture_stdout(monkeypatch)
+    mock_config = config_factory(system_instruction="You are a helpful assistant.")
 
-        # Setup mock session attributes
-        mock_session_instance = MockSession.return_value
-        mock_session_instance.model = "gpt-4o"
-        mock_session_instance.temperature = 0.8
-        
-        # Setup mock client with async close
-        mock_client = MagicMock()
-        mock_client.close = mock_close
-        mock_session_instance.client = mock_client
-        
-        # Setup mock mcp_manager
-        mock_mcp_manager = MagicMock()
-        mock_mcp_manager.cleanup = mock_cleanup
-        mock_mcp_manager.load_config = MagicMock()
-        mock_mcp_manager.connect_autoconnect_servers = AsyncMock()
-        mock_session_instance.mcp_manager = mock_mcp_manager
-        
-        MockRepl.return_value.run = mock_run
-
-        # Set capture level to INFO
-        caplog.set_level(logging.INFO)
-
-        main()
-
-        assert "Session initialized with model: gpt-4o, temperature: 0.8" in caplog.text
-
-def test_session_history():
+    # Create session
+    session = Session(mock_config)
+    # Swap the module-wide AsyncOpenAI mock for a plain stub client
+    session.client = SimpleNamespace(
+        chat=SimpleNamespace(completions=SimpleNamespace(create=_create_completion)),
+        close=AsyncMock(),
+    )
+
+    repl = Repl(session)
+
+    # Send a prompt
+    await repl.handle_input("Hello AI")
+
+    # Verify output
+    # Check for the response.
+    assert "AI Response" in stdout_buffer.getvalue()
+
+    # Verify logs
+    assert "Request: Hello AI" in debug_logs.text
+
+@pytest.mark.parametrize("config_extra, messages_to_add, files, expected_history", [
+    # History is trimmed to the last max_history messages
+    pytest.param({"max_history": "2"},
+                 [("user", "msg1"), ("assistant", "resp1"), ("user", "msg2")],
+                 {}, [("assistant", "resp1"), ("user", "msg2")], id="max-history"),
+    # Tool instructions are appended to the system prompt only with tools on
+    pytest.param({"tools_enabled": "True"},
+                 [("user", "Hello")],
+                 {}, [("user", "Hello")], id="tools-enabled"),
+    pytest.param({"tools_enabled": "False"},
+                 [("user", "Hello")],
+                 {}, [("user", "Hello")], id="tools-disabled"),
+    pytest.param({},
+                 [],
+                 {"test.py": "def hello():\n    return 'world'"}, [], id="file-context"),
+])
+@pytest.mark.asyncio
+async def test_session_get_messages(config_factory, tmp_path, config_extra, messages_to_add, files, expected_history):
     """
-    Test that session history is maintained and respects max_history.
+    Test that get_messages returns the system prompt, with tool instructions
+    when tools are enabled and any file context, followed by the retained
+    history.
     """
-    mock_config = configparser.ConfigParser()
-    mock_config["DEFAULT"] = {
-        "api_key": "test-key",
-        "max_history": "2",
-        "system_instruction": "System"
-    }
-
-    session = Session(mock_config)
+    session = Session(config_factory(**config_extra))
+    session.tool_awareness = _TOOL_AWARENESS
 
-    # Add messages
-    session.add_message("user", "msg1")
-    session.add_message("assistant", "resp1")
-    session.add_message("user", "msg2")
+    for role, content in messages_to_add:
+        session.add_message(role, content)
+    for name, content in files.items():
+        path = tmp_path / name
+        path.write_text(content)
+        await session.file_context.add_file(path)
 
-    # Check history length (should be 2 because max_history is 2)
-    assert len(session.history) == 2
-    assert session.history[0]["content"] == "resp1"
-    assert session.history[1]["content"] == "msg2"
+    assert [(m["role"], m["content"]) for m in session.history] == expected_history
 
-    # Check full messages (should include system instruction + 2 history messages)
     messages = session.get_messages()
-    assert len(messages) == 3
+    assert len(messages) == 1 + len(expected_history)
     assert messages[0]["role"] == "system"
-    assert messages[1]["content"] == "resp1"
-    assert messages[2]["content"] == "msg2"
+    assert [(m["role"], m["content"]) for m in messages[1:]] == expected_history
+    assert (_TOOL_AWARENESS in messages[0]["content"]) == session.tools_enabled
+    assert ("## File Context" in messages[0]["content"]) == bool(files)
+    for content in files.values():
+        assert content in messages[0]["content"]
 
 @pytest.mark.asyncio
-async def test_session_management():
+async def test_session_management(config_factory, tmp_path):
     """
     Test saving, loading, and listing sessions.
     """
-    mock_config = configparser.ConfigParser()
-    mock_config["DEFAULT"] = {
-        "api_key": "test-key",
-        "max_history": "100"
-    }
+    mock_config = config_factory(max_history="100")
 
     # Create a temp dir for sessions
-    with tempfile.TemporaryDirectory() as temp_dir:
-        session = Session(mock_config)
-        session.sessions_dir = temp_dir
-
-        # Add some history
-        session.add_message("user", "hello")
-        session.add_message("assistant", "hi")
-
-        # Test Save
-        name = await session.save_session("test_session")
-        assert name == "test_session"
-        assert os.path.exists(os.path.join(temp_dir, "test_session.json"))
-
-        # Test List
-        sessions = session.list_sessions()
-        assert len(sessions) == 1
-        assert sessions[0]["name"] == "test_session"
-
-        # Test Load
-        # Create a new session object to load into
-        new_session = Session(mock_config)
-        new_session.sessions_dir = temp_dir
-        loaded_name = await new_session.load_session("test_session")
-
-        assert loaded_name == "test_session"
-        assert len(new_session.history) == 2
-        assert new_session.history[0]["content"] == "hello"
+    temp_dir = str(tmp_path)
+    session = Session(mock_config)
+    session.sessions_dir = temp_dir
+
+    # Add some history
+    session.add_message("user", "hello")
+    session.add_message("assistant", "hi")
+
+    # Test Save
+    name = await session.save_session("test_session")
+    assert name == "test_session"
+    assert os.path.exists(os.path.join(temp_dir, "test_session.json"))
+
+    # Test List
+    sessions = session.list_sessions()
+    assert len(sessions) == 1
+    assert sessions[0]["name"] == "test_session"
+
+    # Test Load
+    # Create a new session object to load into
+    new_session = Session(mock_config)
+    new_session.sessions_dir = temp_dir
+    loaded_name = await new_session.load_session("test_session")
 
+    assert loaded_name == "test_session"
+    assert len(new_session.history) == 2
+    assert new_session.history[0]["content"] == "hello"
+
+
+@pytest.mark.asyncio
+async def test_session_file_format(tmp_path, session, json_backend):
+    """
+    Test saved sessions are equivalent indented UTF-8 JSON with either JSON
+    backend, and load back unchanged.
+    """
+    session.sessions_dir = str(tmp_path)
+    session.add_message("user", "hello")
+    session.add_message("assistant", "héllo ✓")
+    history = list(session.history)
+
+    await session.save_session("fmt")
+    saved = (tmp_path / "fmt.json").read_bytes()
+    assert saved.startswith(b'[\n  {\n    "role": "user"')
+    assert json.loads(saved.decode("utf-8")) == history
+
+    session.history = []
+    await session.load_session("fmt")
+    assert session.history == history
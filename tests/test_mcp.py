@@ -1,22 +1,36 @@
 """Tests for MCP manager and tool registry."""
 
+import asyncio
+import threading
 import pytest
 import pytest_asyncio
-from unittest.mock import MagicMock, AsyncMock, patch
-from mcp_manager import MCPManager, MCPConnection, MCPServerConfig
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+from tools import Tool
+from mcp_manager import MCPManager, MCPConnection, MCPServerConfig, MCPToolEntry
 from tool_registry import ToolRegistry
 
 
-def test_mcp_server_config():
-    """Test MCPServerConfig initialization."""
-    config = {
+@pytest.fixture(scope="module")
+def sample_server_config():
+    """Server config dict shared by the tests in this module; treat as read-only."""
+    return {
         "command": "npx",
         "args": ["-y", "@modelcontextprotocol/server-filesystem", "~/test"],
         "autoconnect": True,
         "description": "Test server"
     }
-    
-    server_config = MCPServerConfig("test_server", config)
+
+
+@pytest.fixture(scope="module")
+def empty_mcp_manager():
+    """MCPManager with no servers loaded, shared by read-only tests."""
+    return MCPManager()
+
+
+def test_mcp_server_config(sample_server_config):
+    """Test MCPServerConfig initialization."""
+    server_config = MCPServerConfig("test_server", sample_server_config)
     
     assert server_config.name == "test_server"
     assert server_config.command == "npx"
@@ -34,18 +48,18 @@ def test_mcp_manager_initialization():
     assert len(manager.connections) == 0
 
 
-def test_mcp_manager_namespace_tool_name():
+def test_mcp_manager_namespace_tool_name(sample_server_config):
     """Test tool name namespacing."""
-    config = MCPServerConfig("github", {"command": "test", "args": []})
+    config = MCPServerConfig("github", sample_server_config)
     connection = MCPConnection(config)
     
     namespaced = connection._namespace_tool_name("list_repos")
     assert namespaced == "mcp_github_list_repos"
 
 
-def test_tool_registry_initialization():
+def test_tool_registry_initialization(readonly_registry):
     """Test ToolRegistry initialization."""
-    registry = ToolRegistry()
+    registry = readonly_registry
     
     # Should have local tools initialized
     assert "calculator" in registry.local_tools
@@ -53,9 +67,9 @@ def test_tool_registry_initialization():
     assert "shell_command" in registry.local_tools
 
 
-def test_tool_registry_list_tools():
+def test_tool_registry_list_tools(readonly_registry):
     """Test listing tools without MCP manager."""
-    registry = ToolRegistry()
+    registry = readonly_registry
     
     tools = registry.list_tools()
     
@@ -64,9 +78,9 @@ def test_tool_registry_list_tools():
     assert "shell_command" in tools
 
 
-def test_tool_registry_get_tool_schemas():
+def test_tool_registry_get_tool_schemas(readonly_registry):
     """Test getting tool schemas without MCP."""
-    registry = ToolRegistry()
+    registry = readonly_registry
     
     schemas = registry.get_tool_schemas()
     
@@ -75,20 +89,71 @@ def test_tool_registry_get_tool_schemas():
     assert all(schema["type"] == "function" for schema in schemas)
 
 
-@pytest.mark.asyncio
-async def test_tool_registry_execute_local_tool():
+def test_tool_registry_get_tool_schemas_is_cached(readonly_registry):
+    """Test the schema list is built once while no MCP manager is set."""
+    registry = readonly_registry
+
+    assert registry.get_tool_schemas() is registry.get_tool_schemas()
+
+
+async def test_tool_registry_execute_local_tool(readonly_registry):
     """Test executing a local tool through the registry."""
-    registry = ToolRegistry()
+    registry = readonly_registry
     
     result = await registry.execute_tool("calculator", '{"expression": "5 + 5"}')
     
     assert result == "10.0"
 
 
-@pytest.mark.asyncio
-async def test_tool_registry_execute_unknown_tool():
+def registry_with_tool(monkeypatch, tool):
+    """Build a ToolRegistry whose only local tool is tool."""
+    monkeypatch.setattr("tool_registry.create_local_tool_registry", lambda: {tool.name: tool})
+    return ToolRegistry()
+
+
+async def test_tool_registry_local_tool_does_not_block_loop(monkeypatch):
+    """Test a blocking local tool runs off the event loop."""
+    release = threading.Event()
+    registry = registry_with_tool(monkeypatch, Tool(
+        name="wait",
+        description="Blocks until released",
+        parameters={},
+        function=lambda: release.wait(timeout=5),
+    ))
+
+    task = asyncio.create_task(registry.execute_tool("wait", '{}'))
+    # The loop keeps running while the tool blocks in its thread
+    await asyncio.sleep(0.01)
+    assert not task.done()
+    release.set()
+
+    assert await task == "True"
+
+
+async def test_tool_registry_execute_tools_batch(monkeypatch):
+    """Test batched tool calls run concurrently and keep request order."""
+    barrier = threading.Barrier(2, timeout=5)
+    registry = registry_with_tool(monkeypatch, Tool(
+        name="meet",
+        description="Waits for a second concurrent call",
+        parameters={},
+        function=lambda tag: f"{tag}:{barrier.wait()}",
+    ))
+
+    results = await registry.execute_tools_batch([
+        ("meet", '{"tag": "a"}'),
+        ("meet", '{"tag": "b"}'),
+        ("nonexistent_tool", '{}'),
+    ])
+
+    # Both calls only get past the barrier if they run at the same time
+    assert [r.split(":")[0] for r in results[:2]] == ["a", "b"]
+    assert "Unknown tool" in results[2]
+
+
+async def test_tool_registry_execute_unknown_tool(readonly_registry):
     """Test executing an unknown tool."""
-    registry = ToolRegistry()
+    registry = readonly_registry
     
     result = await registry.execute_tool("nonexistent_tool", '{}')
     
@@ -96,9 +161,9 @@ async def test_tool_registry_execute_unknown_tool():
     assert "Unknown tool" in result
 
 
-def test_tool_registry_get_tool_info():
+def test_tool_registry_get_tool_info(readonly_registry):
     """Test getting tool information."""
-    registry = ToolRegistry()
+    registry = readonly_registry
     
     # Test local tool
     info = registry.get_tool_info("calculator")
@@ -110,31 +175,28 @@ def test_tool_registry_get_tool_info():
     assert "parameters" in info
 
 
-def test_tool_registry_get_tool_info_not_found():
+def test_tool_registry_get_tool_info_not_found(readonly_registry):
     """Test getting info for non-existent tool."""
-    registry = ToolRegistry()
+    registry = readonly_registry
     
     info = registry.get_tool_info("nonexistent_tool")
     
     assert info is None
 
 
-@pytest.mark.asyncio
-async def test_tool_registry_with_mcp_manager():
-    """Test tool registry with mocked MCP manager."""
-    # Create mock MCP manager
+@pytest.fixture
+def mock_mcp_manager():
+    """Mocked MCP manager exposing two tools, one schema and a canned call_tool."""
     mock_mcp_manager = MagicMock()
     
-    # Mock the get_all_tools method
-    mock_mcp_manager.get_all_tools.return_value = {
-        "mcp_github_list_repos": {
-            "server": "github",
-            "description": "List repositories",
-            "tool": MagicMock()
-        }
+    mcp_tools = {
+        "mcp_github_list_repos": MCPToolEntry("github", "List repositories", MagicMock()),
+        "mcp_test_tool": MCPToolEntry("test", "Test tool", MagicMock()),
     }
+    mock_mcp_manager.get_all_tools.return_value = mcp_tools
+    mock_mcp_manager.has_tool.side_effect = mcp_tools.__contains__
+    mock_mcp_manager.get_tool.side_effect = mcp_tools.get
     
-    # Mock get_tool_schemas
     mock_mcp_manager.get_tool_schemas.return_value = [
         {
             "type": "function",
@@ -146,12 +208,44 @@ async def test_tool_registry_with_mcp_manager():
         }
     ]
     
+    # call_tool is awaited by the registry
+    async def mock_call_tool(tool_name, args):
+        return "Mock result"
+    
+    mock_mcp_manager.call_tool = mock_call_tool
+    return mock_mcp_manager
+
+
+def test_mcp_manager_get_tool():
+    """Test single-tool lookup and name checks follow connected servers."""
+    manager = MCPManager()
+    tool = SimpleNamespace(name="list_repos", description="List repositories")
+    manager.connections = {
+        "github": SimpleNamespace(connected=True, tools={"mcp_github_list_repos": tool}),
+        "offline": SimpleNamespace(connected=False, tools={"mcp_offline_ping": tool}),
+    }
+    manager._refresh_tool_entries()
+
+    assert manager.version == 1
+    assert manager.has_tool("mcp_github_list_repos")
+    assert not manager.has_tool("mcp_offline_ping")
+    entry = manager.get_tool("mcp_github_list_repos")
+    assert (entry.server, entry.description, entry.tool) == ("github", "List repositories", tool)
+    assert manager.get_all_tools() == {"mcp_github_list_repos": manager.get_tool("mcp_github_list_repos")}
+    assert manager.get_all_tools(server_filter="offline") == {}
+    assert manager.get_tool("mcp_offline_ping") is None
+    assert manager.get_tool("mcp_github_missing") is None
+
+
+async def test_tool_registry_with_mcp_manager(mock_mcp_manager):
+    """Test tool registry with mocked MCP manager."""
     registry = ToolRegistry(mock_mcp_manager)
     
     # Test that MCP tools are included
     all_tools = registry.get_all_tools()
     assert "calculator" in all_tools  # Local tool
     assert "mcp_github_list_repos" in all_tools  # MCP tool
+    assert all_tools["mcp_github_list_repos"].type == "mcp"
     
     # Test schemas include both local and MCP
     schemas = registry.get_tool_schemas()
@@ -163,27 +257,25 @@ async def test_tool_registry_with_mcp_manager():
     assert "mcp_github_list_repos" in tools
 
 
-@pytest.mark.asyncio
-async def test_tool_registry_execute_mcp_tool():
+def test_tool_registry_cache_follows_mcp_version(mock_mcp_manager):
+    """Test cached tools and schemas are rebuilt when the MCP version changes."""
+    mock_mcp_manager.version = 1
+    registry = ToolRegistry(mock_mcp_manager)
+
+    tools = registry.get_all_tools()
+    schemas = registry.get_tool_schemas()
+    assert registry.get_all_tools() is tools
+    assert registry.get_tool_schemas() is schemas
+    assert mock_mcp_manager.get_all_tools.call_count == 1
+
+    mock_mcp_manager.version = 2
+    assert registry.get_all_tools() is not tools
+    assert registry.get_tool_schemas() is not schemas
+    assert mock_mcp_manager.get_all_tools.call_count == 2
+
+
+async def test_tool_registry_execute_mcp_tool(mock_mcp_manager):
     """Test executing an MCP tool through the registry."""
-    # Create mock MCP manager
-    mock_mcp_manager = MagicMock()
-    
-    # Mock the call_tool method to return a coroutine
-    async def mock_call_tool(tool_name, args):
-        return "Mock result"
-    
-    mock_mcp_manager.call_tool = mock_call_tool
-    
-    # Mock get_all_tools to include our tool
-    mock_mcp_manager.get_all_tools.return_value = {
-        "mcp_test_tool": {
-            "server": "test",
-            "description": "Test tool",
-            "tool": MagicMock()
-        }
-    }
-    
     registry = ToolRegistry(mock_mcp_manager)
     
     result = await registry.execute_tool("mcp_test_tool", '{"arg": "value"}')
@@ -191,29 +283,39 @@ async def test_tool_registry_execute_mcp_tool():
     assert result == "Mock result"
 
 
-def test_mcp_manager_get_status_empty():
+async def test_tool_registry_execute_unknown_mcp_tool(mock_mcp_manager):
+    """Test MCP-prefixed names the manager does not offer are unknown tools."""
+    registry = ToolRegistry(mock_mcp_manager)
+
+    result = await registry.execute_tool("mcp_github_missing", '{}')
+
+    assert "Unknown tool" in result
+
+
+def test_tool_registry_get_mcp_tool_info(mock_mcp_manager):
+    """Test MCP tool info comes from a single-tool lookup."""
+    registry = ToolRegistry(mock_mcp_manager)
+
+    info = registry.get_tool_info("mcp_github_list_repos")
+
+    assert info == {
+        "name": "mcp_github_list_repos",
+        "type": "mcp",
+        "server": "github",
+        "description": "List repositories",
+    }
+    mock_mcp_manager.get_all_tools.assert_not_called()
+
+
+def test_mcp_manager_get_status_empty(empty_mcp_manager):
     """Test getting status with no servers configured."""
-    manager = MCPManager()
-    
-    status = manager.get_status()
+    status = empty_mcp_manager.get_status()
     
     assert status == []
 
 
-def test_tool_registry_list_tools_with_server_filter():
+def test_tool_registry_list_tools_with_server_filter(mock_mcp_manager):
     """Test listing tools with server filter."""
-    # Create mock MCP manager
-    mock_mcp_manager = MagicMock()
-    
-    # Mock get_all_tools with server filter
-    mock_mcp_manager.get_all_tools.return_value = {
-        "mcp_github_list_repos": {
-            "server": "github",
-            "description": "List repositories",
-            "tool": MagicMock()
-        }
-    }
-    
     registry = ToolRegistry(mock_mcp_manager)
     
     # Test filtering by server (should only return MCP tools from that server)
@@ -2,251 +2,120 @@ import configparser
 import pytest
 import pytest_asyncio
 from session import Session
-from repl import Repl
 
-@pytest.mark.asyncio
-async def test_session_default_model():
-    """Test that the default model is set to 'default' (gpt-4o)."""
-    mock_config = configparser.ConfigParser()
-    mock_config["DEFAULT"] = {"api_key": "test-key"}
-    session = Session(mock_config)
-    # Default model resolves to 'gpt-4o' in MODEL_PRESETS
-    assert session.model == "gpt-4o"
-
-
-@pytest.mark.asyncio
-async def test_set_temperature_numeric():
-    """Test setting temperature with numeric value."""
-    mock_config = configparser.ConfigParser()
-    mock_config["DEFAULT"] = {"api_key": "test-key"}
-    session = Session(mock_config)
-
-    # Test valid numeric value
-    value, message = session.set_temperature("0.9")
-    assert value == 0.9
-    assert session.temperature == 0.9
-    assert "0.9" in message
-
-
-@pytest.mark.asyncio
-async def test_set_temperature_preset():
-    """Test setting temperature with preset values."""
-    mock_config = configparser.ConfigParser()
-    mock_config["DEFAULT"] = {"api_key": "test-key"}
-    session = Session(mock_config)
-
-    # Test rigid preset
-    value, message = session.set_temperature("rigid")
-    assert value == 0.2
-    assert session.temperature == 0.2
-    assert "rigid" in message
-
-    # Test creative preset
-    value, message = session.set_temperature("creative")
-    assert value == 1.2
-    assert session.temperature == 1.2
-    assert "creative" in message
-
-
-@pytest.mark.asyncio
-async def test_set_temperature_out_of_range():
-    """Test temperature auto-correction for out-of-range values."""
-    mock_config = configparser.ConfigParser()
-    mock_config["DEFAULT"] = {"api_key": "test-key"}
-    session = Session(mock_config)
-
-    # Test value too high
-    value, message = session.set_temperature("3.0")
-    assert value == 2.0
-    assert session.temperature == 2.0
-    assert "adjusted" in message.lower()
+# Preset tables snapshotted once at import
+_TEMPERATURE_PRESETS = Session.TEMPERATURE_PRESETS
+_MODEL_PRESETS = Session.MODEL_PRESETS
 
-    # Test value too low
-    value, message = session.set_temperature("-0.5")
-    assert value == 0.0
-    assert session.temperature == 0.0
-    assert "adjusted" in message.lower()
+# PERSONALITIES section fed to test_personality_presets
+_PERSONALITIES = {
+    "helpful": "You are a helpful and concise assistant. You enjoy helping the user with their requests.",
+    "terse": "You are a laconic assistant that provides limited but correct responses. You have better things to do.",
+    "detailed": "You are a helpful assistant that provides comprehensive, thorough responses. Include relevant details and explanations.",
+    "creative": "You are an imaginative and creative collaborator. Use the prompt as inspiration to create and explore.",
+}
 
 
 @pytest.mark.asyncio
-async def test_set_temperature_invalid():
-    """Test invalid temperature values."""
-    mock_config = configparser.ConfigParser()
-    mock_config["DEFAULT"] = {"api_key": "test-key"}
-    session = Session(mock_config)
-
-    # Test invalid string
-    with pytest.raises(ValueError) as exc_info:
-        session.set_temperature("invalid")
-    assert "Invalid temperature" in str(exc_info.value)
-
-
-@pytest.mark.asyncio
-async def test_set_model_preset():
-    """Test setting model with preset values."""
-    mock_config = configparser.ConfigParser()
-    mock_config["DEFAULT"] = {"api_key": "test-key"}
-    session = Session(mock_config)
-
-    # Test mini preset
-    value, message = session.set_model("mini")
-    assert value == "gpt-5-mini"
-    assert session.model == "gpt-5-mini"
-    assert "gpt-5-mini" in message
+async def test_session_default_model(readonly_session):
+    """Test that the default model is set to 'default' (gpt-4o)."""
+    # Default model resolves to 'gpt-4o' in MODEL_PRESETS
+    assert readonly_session.model == "gpt-4o"
 
 
+@pytest.mark.parametrize("value_in, expected, marker", [
+    pytest.param("0.9", 0.9, "0.9", id="numeric"),
+    pytest.param("rigid", 0.2, "rigid", id="preset-rigid"),
+    pytest.param("creative", 1.2, "creative", id="preset-creative"),
+    pytest.param("3.0", 2.0, "adjusted", id="too-high"),
+    pytest.param("-0.5", 0.0, "adjusted", id="too-low"),
+])
 @pytest.mark.asyncio
-async def test_set_model_direct():
-    """Test setting model with direct model name."""
-    mock_config = configparser.ConfigParser()
-    mock_config["DEFAULT"] = {"api_key": "test-key"}
-    session = Session(mock_config)
-
-    # Test direct model name
-    value, message = session.set_model("gpt-5-mini")
-    assert value == "gpt-5-mini"
-    assert session.model == "gpt-5-mini"
+async def test_set_temperature(session, value_in, expected, marker):
+    """Test setting temperature by number or preset, clamping out-of-range values."""
+    value, message = session.set_temperature(value_in)
+    assert value == expected
+    assert session.temperature == expected
+    assert marker in message.lower()
 
 
+@pytest.mark.parametrize("value_in, expected", [
+    pytest.param("mini", "gpt-5-mini", id="preset"),
+    pytest.param("gpt-5-mini", "gpt-5-mini", id="direct"),
+])
 @pytest.mark.asyncio
-async def test_set_model_invalid():
-    """Test invalid model values."""
-    mock_config = configparser.ConfigParser()
-    mock_config["DEFAULT"] = {"api_key": "test-key"}
-    session = Session(mock_config)
-
-    # Test invalid model
-    with pytest.raises(ValueError) as exc_info:
-        session.set_model("invalid-model")
-    assert "Unknown model" in str(exc_info.value)
+async def test_set_model(session, value_in, expected):
+    """Test setting model by preset or direct model name."""
+    value, message = session.set_model(value_in)
+    assert value == expected
+    assert session.model == expected
+    assert expected in message
 
 
+@pytest.mark.parametrize("preset, instruction_marker", [
+    pytest.param("terse", "laconic", id="terse"),
+    pytest.param("detailed", "comprehensive", id="detailed"),
+])
 @pytest.mark.asyncio
-async def test_set_personality_preset():
+async def test_set_personality_preset(session, preset, instruction_marker):
     """Test setting personality with preset values."""
-    mock_config = configparser.ConfigParser()
-    mock_config["DEFAULT"] = {"api_key": "test-key"}
-    session = Session(mock_config)
-
-    # Test terse preset
-    value, message = session.set_personality("terse")
-    assert value == "terse"
-    assert session.personality == "terse"
-    assert "laconic" in session.system_instruction.lower()
-    assert "terse" in message
-
-    # Test detailed preset
-    value, message = session.set_personality("detailed")
-    assert value == "detailed"
-    assert session.personality == "detailed"
-    assert "comprehensive" in session.system_instruction.lower()
-
-
-@pytest.mark.asyncio
-async def test_set_personality_invalid():
-    """Test invalid personality values."""
-    mock_config = configparser.ConfigParser()
-    mock_config["DEFAULT"] = {"api_key": "test-key"}
-    session = Session(mock_config)
-
-    # Test invalid personality
-    with pytest.raises(ValueError) as exc_info:
-        session.set_personality("invalid")
-    assert "Unknown personality" in str(exc_info.value)
-
-
-@pytest.mark.asyncio
-async def test_cmd_set_temperature(capsys):
-    """Test /set command for temperature in REPL."""
-    mock_config = configparser.ConfigParser()
-    mock_config["DEFAULT"] = {"api_key": "test-key"}
-    session = Session(mock_config)
-    repl = Repl(session)
-
-    # Test /set temp
-    await repl.handle_input("/set temp 0.8")
+    value, message = session.set_personality(preset)
+    assert value == preset
+    assert session.personality == preset
+    assert instruction_marker in session.system_instruction.lower()
+    assert preset in message
+
+
+@pytest.mark.parametrize("setter, value_in, error", [
+    pytest.param("set_temperature", "invalid", "Invalid temperature", id="temperature"),
+    pytest.param("set_model", "invalid-model", "Unknown model", id="model"),
+    pytest.param("set_personality", "invalid", "Unknown personality", id="personality"),
+])
+@pytest.mark.asyncio
+async def test_set_invalid(session, setter, value_in, error):
+    """Test each setter rejects values it does not recognize."""
+    with pytest.raises(ValueError, match=error):
+        getattr(session, setter)(value_in)
+
+
+@pytest.mark.parametrize("cmd, expect_out, attr, expect_val", [
+    pytest.param("/set temp 0.8", "0.8", "temperature", 0.8, id="temperature"),
+    # Use standard to avoid temp validation message
+    pytest.param("/set model standard", "gpt-4o", "model", "gpt-4o", id="model"),
+    pytest.param("/set personality creative", "creative", "personality", "creative", id="personality"),
+    pytest.param("/set invalid value", "Unknown option", None, None, id="invalid-option"),
+])
+@pytest.mark.asyncio
+async def test_cmd_set(capsys, session, repl, cmd, expect_out, attr, expect_val):
+    """Test /set command in REPL for each option."""
+    await repl.handle_input(cmd)
     captured = capsys.readouterr()
-    assert "0.8" in captured.out
-    assert session.temperature == 0.8
+    assert expect_out in captured.out
+    if attr:
+        assert getattr(session, attr) == expect_val
 
 
 @pytest.mark.asyncio
-async def test_cmd_set_model(capsys):
-    """Test /set command for model in REPL."""
-    mock_config = configparser.ConfigParser()
-    mock_config["DEFAULT"] = {"api_key": "test-key"}
-    session = Session(mock_config)
-    repl = Repl(session)
-
-    # Test /set model (use standard to avoid temp validation message)
-    await repl.handle_input("/set model standard")
-    captured = capsys.readouterr()
-    assert "gpt-4o" in captured.out
-    assert session.model == "gpt-4o"
-
-
-@pytest.mark.asyncio
-async def test_cmd_set_personality(capsys):
-    """Test /set command for personality in REPL."""
-    mock_config = configparser.ConfigParser()
-    mock_config["DEFAULT"] = {"api_key": "test-key"}
-    session = Session(mock_config)
-    repl = Repl(session)
-
-    # Test /set personality
-    await repl.handle_input("/set personality creative")
-    captured = capsys.readouterr()
-    assert "creative" in captured.out
-    assert session.personality == "creative"
-
-
-@pytest.mark.asyncio
-async def test_cmd_set_invalid_option(capsys):
-    """Test /set command with invalid option."""
-    mock_config = configparser.ConfigParser()
-    mock_config["DEFAULT"] = {"api_key": "test-key"}
-    session = Session(mock_config)
-    repl = Repl(session)
-
-    # Test invalid option
-    await repl.handle_input("/set invalid value")
-    captured = capsys.readouterr()
-    assert "Unknown option" in captured.out
-
-
-@pytest.mark.asyncio
-async def test_cmd_set_missing_args(capsys):
+async def test_cmd_set_missing_args(capsys, repl):
     """Test /set command with missing arguments."""
-    mock_config = configparser.ConfigParser()
-    mock_config["DEFAULT"] = {"api_key": "test-key"}
-    session = Session(mock_config)
-    repl = Repl(session)
-
     # Test missing value
     await repl.handle_input("/set temp")
     captured = capsys.readouterr()
     assert "Usage" in captured.out
 
 
-@pytest.mark.asyncio
-async def test_temperature_presets():
-    """Test all temperature presets are defined correctly."""
-    assert Session.TEMPERATURE_PRESETS["rigid"] == 0.2
-    assert Session.TEMPERATURE_PRESETS["balanced"] == 0.7
-    assert Session.TEMPERATURE_PRESETS["creative"] == 1.2
-
-
-@pytest.mark.asyncio
-async def test_model_presets():
-    """Test all model presets are defined correctly."""
-    # Test standard preset
-    assert Session.MODEL_PRESETS["standard"] == "gpt-4o"
-    # Test mini preset
-    assert Session.MODEL_PRESETS["mini"] == "gpt-5-mini"
-    # Test nano preset
-    assert Session.MODEL_PRESETS["nano"] == "gpt-5-nano"
-    # Test reasoning preset
-    assert Session.MODEL_PRESETS["reasoning"] == "gpt-5.2"
+@pytest.mark.parametrize("preset_dict, key, expected", [
+    pytest.param(_TEMPERATURE_PRESETS, "rigid", 0.2, id="temp-rigid"),
+    pytest.param(_TEMPERATURE_PRESETS, "balanced", 0.7, id="temp-balanced"),
+    pytest.param(_TEMPERATURE_PRESETS, "creative", 1.2, id="temp-creative"),
+    pytest.param(_MODEL_PRESETS, "standard", "gpt-4o", id="model-standard"),
+    pytest.param(_MODEL_PRESETS, "mini", "gpt-5-mini", id="model-mini"),
+    pytest.param(_MODEL_PRESETS, "nano", "gpt-5-nano", id="model-nano"),
+    pytest.param(_MODEL_PRESETS, "reasoning", "gpt-5.2", id="model-reasoning"),
+])
+def test_presets(preset_dict, key, expected):
+    """Test temperature and model presets are defined correctly."""
+    assert preset_dict[key] == expected
 
 
 @pytest.mark.asyncio
@@ -254,16 +123,9 @@ async def test_personality_presets():
     """Test all personality presets are defined correctly."""
     # Test that default personalities are loaded from config or fallback
     config = configparser.ConfigParser()
-    config.add_section("PERSONALITIES")
-    config.set("PERSONALITIES", "helpful", "You are a helpful and concise assistant. You enjoy helping the user with their requests.")
-    config.set("PERSONALITIES", "terse", "You are a laconic assistant that provides limited but correct responses. You have better things to do.")
-    config.set("PERSONALITIES", "detailed", "You are a helpful assistant that provides comprehensive, thorough responses. Include relevant details and explanations.")
-    config.set("PERSONALITIES", "creative", "You are an imaginative and creative collaborator. Use the prompt as inspiration to create and explore.")
+    config.read_dict({"PERSONALITIES": _PERSONALITIES})
     session = Session(config)
-    assert "helpful" in session.personality_presets
-    assert "terse" in session.personality_presets
-    assert "detailed" in session.personality_presets
-    assert "creative" in session.personality_presets
+    assert set(_PERSONALITIES) <= set(session.personality_presets)
     # Verify each has a system instruction
     for personality, instruction in session.personality_presets.items():
         assert isinstance(instruction, str)
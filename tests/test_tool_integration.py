@@ -1,37 +1,39 @@
 """Integration tests for tool calling functionality."""
 
-import configparser
 import pytest
 import pytest_asyncio
-from unittest.mock import Mock, patch, MagicMock, AsyncMock
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
 from session import Session
 from repl import Repl
 
+# Local tools every Session registers
+_EXPECTED_TOOLS = frozenset({"calculator", "get_datetime", "shell_command"})
+
+
+def completion_mock(content):
+    """AsyncMock for chat.completions.create answering with a single message."""
+    return AsyncMock(return_value=SimpleNamespace(
+        choices=[SimpleNamespace(message=SimpleNamespace(content=content, tool_calls=None))],
+        usage=None,
+    ))
+
 
 @pytest.mark.asyncio
-async def test_session_tool_integration():
+async def test_session_tool_integration(session):
     """Test Session class tool integration."""
-    config = configparser.ConfigParser()
-    config["DEFAULT"] = {
-        "api_key": "test-key",
-        "tools_enabled": "True"
-    }
-    
-    session = Session(config)
-    
     # Test tools_enabled flag
     assert session.tools_enabled is True
     
     # Test list_tools
     tools = session.list_tools()
-    assert "calculator" in tools
-    assert "get_datetime" in tools
-    assert "shell_command" in tools
+    assert _EXPECTED_TOOLS.issubset(tools)
     
     # Test get_tool_schemas
     schemas = session.get_tool_schemas()
-    assert len(schemas) == 3
-    assert all(s["type"] == "function" for s in schemas)
+    assert len(schemas) == len(_EXPECTED_TOOLS)
+    assert {s["function"]["name"] for s in schemas} == _EXPECTED_TOOLS
+    assert {s["type"] for s in schemas} == {"function"}
     
     # Test execute_tool
     result = await session.execute_tool("calculator", '{"expression": "10 + 5"}')
@@ -43,15 +45,9 @@ async def test_session_tool_integration():
 
 
 @pytest.mark.asyncio
-async def test_session_tools_disabled():
+async def test_session_tools_disabled(config_factory):
     """Test Session with tools disabled."""
-    config = configparser.ConfigParser()
-    config["DEFAULT"] = {
-        "api_key": "test-key",
-        "tools_enabled": "False"
-    }
-    
-    session = Session(config)
+    session = Session(config_factory(tools_enabled="False"))
     
     assert session.tools_enabled is False
     
@@ -61,39 +57,22 @@ async def test_session_tools_disabled():
 
 
 @pytest.mark.asyncio
-async def test_repl_tools_command(capsys):
+async def test_repl_tools_command(capsys, repl):
     """Test /tools command in REPL."""
-    config = configparser.ConfigParser()
-    config["DEFAULT"] = {
-        "api_key": "test-key",
-        "tools_enabled": "True"
-    }
-    
-    session = Session(config)
-    repl = Repl(session)
-    
     # Execute /tools command
     await repl.cmd_tools([])
     
     captured = capsys.readouterr()
     
     # Should display all three tools
-    assert "calculator" in captured.out
-    assert "get_datetime" in captured.out
-    assert "shell_command" in captured.out
+    assert all(name in captured.out for name in _EXPECTED_TOOLS)
     assert "Available Tools" in captured.out
 
 
 @pytest.mark.asyncio
-async def test_repl_tools_command_disabled(capsys):
+async def test_repl_tools_command_disabled(capsys, config_factory):
     """Test /tools command when tools are disabled."""
-    config = configparser.ConfigParser()
-    config["DEFAULT"] = {
-        "api_key": "test-key",
-        "tools_enabled": "False"
-    }
-    
-    session = Session(config)
+    session = Session(config_factory(tools_enabled="False"))
     repl = Repl(session)
     
     # Execute /tools command
@@ -106,62 +85,35 @@ async def test_repl_tools_command_disabled(capsys):
 
 
 @pytest.mark.asyncio
-async def test_handle_tool_calls_integration():
+async def test_handle_tool_calls_integration(mocked_openai_session):
     """Test _handle_tool_calls method."""
-    config = configparser.ConfigParser()
-    config["DEFAULT"] = {
-        "api_key": "test-key",
-        "tools_enabled": "True"
-    }
-    
-    with patch('session.AsyncOpenAI') as MockAsyncOpenAI:
-        session = Session(config)
-        mock_client = MockAsyncOpenAI.return_value
-        session.client = mock_client
-        repl = Repl(session)
-        
-        # Create mock tool call
-        mock_tool_call = Mock()
-        mock_tool_call.id = "call_123"
-        mock_tool_call.type = "function"
-        mock_tool_call.function = Mock()
-        mock_tool_call.function.name = "calculator"
-        mock_tool_call.function.arguments = '{"expression": "2 + 2"}'
-        
-        mock_message = Mock()
-        mock_message.content = None
-        mock_message.tool_calls = [mock_tool_call]
-        
-        # Mock the second API call (after tool execution) as async
-        async def mock_create(*args, **kwargs):
-            mock_response = Mock()
-            mock_response.choices = [Mock()]
-            mock_response.choices[0].message = Mock()
-            mock_response.choices[0].message.content = "The result is 4.0"
-            return mock_response
-        
-        mock_client.chat.completions.create = mock_create
-        
-        # Call _handle_tool_calls
-        await repl._handle_tool_calls(mock_message, [])
-        
-        # Verify tool was added to history
-        assert len(session.history) >= 2  # Assistant message + tool result
-        assert any(msg.get("role") == "tool" for msg in session.history)
-        assert any(msg.get("role") == "assistant" for msg in session.history)
+    session, mock_client = mocked_openai_session
+    repl = Repl(session)
+    
+    # Create the assistant message carrying one tool call
+    tool_call = SimpleNamespace(
+        id="call_123",
+        type="function",
+        function=SimpleNamespace(name="calculator", arguments='{"expression": "2 + 2"}'),
+    )
+    message = SimpleNamespace(content=None, tool_calls=[tool_call])
+    
+    # Mock the second API call (after tool execution)
+    mock_client.chat.completions.create = completion_mock("The result is 4.0")
+    
+    # Call _handle_tool_calls
+    await repl._handle_tool_calls(message, [])
+    mock_client.chat.completions.create.assert_awaited_once()
+    
+    # Verify tool was added to history
+    assert len(session.history) >= 2  # Assistant message + tool result
+    assert any(msg.get("role") == "tool" for msg in session.history)
+    assert any(msg.get("role") == "assistant" for msg in session.history)
 
 
 @pytest.mark.asyncio
-async def test_tool_execution_error_handling(capsys):
+async def test_tool_execution_error_handling(session):
     """Test error handling during tool execution."""
-    config = configparser.ConfigParser()
-    config["DEFAULT"] = {
-        "api_key": "test-key",
-        "tools_enabled": "True"
-    }
-    
-    session = Session(config)
-    
     # Test with invalid expression
     result = await session.execute_tool("calculator", '{"expression": "1/0"}')
     assert "Error" in result or "Division by zero" in result
@@ -172,43 +124,11 @@ async def test_tool_execution_error_handling(capsys):
 
 
 @pytest.mark.asyncio
-async def test_tool_call_logging(caplog):
+async def test_tool_call_logging(info_logs, session):
     """Test that tool calls are properly logged."""
-    import logging
-    caplog.set_level(logging.INFO)
-    
-    config = configparser.ConfigParser()
-    config["DEFAULT"] = {
-        "api_key": "test-key",
-        "tools_enabled": "True"
-    }
-    
-    session = Session(config)
-    
     # Execute a shell command to trigger logging
     result = await session.execute_tool("shell_command", '{"command": "echo test"}')
     
     # Check that logging occurred
-    assert any("Executing shell command" in record.message for record in caplog.records)
+    assert any("Executing shell command" in record.message for record in info_logs.records)
 
-
-@pytest.mark.asyncio
-async def test_session_get_messages_with_tools():
-    """Test that get_messages includes proper structure."""
-    config = configparser.ConfigParser()
-    config["DEFAULT"] = {
-        "api_key": "test-key",
-        "tools_enabled": "True",
-        "system_instruction": "Test instruction"
-    }
-    
-    session = Session(config)
-    session.add_message("user", "Hello")
-    
-    messages = session.get_messages()
-    
-    # Should have system message + user message
-    assert len(messages) == 2
-    assert messages[0]["role"] == "system"
-    assert messages[1]["role"] == "user"
-    assert messages[1]["content"] == "Hello"
@@ -1,40 +1,124 @@
+import io
 import json
+import math
+import re
+import subprocess
 import pytest
 import time
+from datetime import datetime
+from unittest.mock import patch
+import tools
 from tools import calculator, get_datetime, shell_command, create_tool_registry, Tool
 
 
-# ============================================================================
-# Calculator Tests
-# ============================================================================
+class _FakeProcess:
+    """Stand-in for the Popen a patched tools.subprocess.Popen returns."""
+
+    def __init__(self, stdout=b"", stderr=b"", returncode=0, wait_error=None):
+        self.args = ""
+        self.stdout = io.BytesIO(stdout)
+        self.stderr = io.BytesIO(stderr)
+        self.returncode = returncode
+        self.wait_error = wait_error
+        self.killed = False
+
+    def wait(self, timeout=None):
+        if self.wait_error is not None and not self.killed:
+            raise self.wait_error
+        return self.returncode
+
+    def kill(self):
+        self.killed = True
+
+
+def _completed(stdout="", stderr="", returncode=0):
+    """Build a finished fake process; str output is encoded to bytes."""
+    if isinstance(stdout, str):
+        stdout = stdout.encode()
+    return _FakeProcess(stdout, stderr.encode(), returncode)
+
+
+class _FrozenDatetime(datetime):
+    """datetime whose now() always returns the same instant."""
+
+    @classmethod
+    def now(cls, tz=None):
+        return cls(2025, 1, 15, 12, 34, 56, tzinfo=tz)
 
-def test_calculator_basic():
-    """Test basic calculator operations."""
-    assert calculator("2 + 2") == 4.0
-    assert calculator("10 * 5") == 50.0
-    assert calculator("100 / 4") == 25.0
-    assert calculator("10 - 3") == 7.0
-    assert calculator("10 % 3") == 1.0
 
+@pytest.fixture
+def frozen_now(monkeypatch):
+    """Pin the clock get_datetime reads to 2025-01-15T12:34:56."""
+    monkeypatch.setattr(tools, "_datetime_now", _FrozenDatetime.now)
 
-def test_calculator_complex():
-    """Test complex calculator expressions."""
-    assert calculator("(2 + 3) * 4") == 20.0
-    assert calculator("10 / (2 + 3)") == 2.0
 
+@pytest.fixture(scope="session")
+def tool_registry():
+    """Local tool registry built once; tests only read and execute its tools."""
+    return create_tool_registry()
 
-def test_calculator_negative_numbers():
-    """Test calculator with negative numbers."""
-    assert calculator("-5 + 3") == -2.0
-    assert calculator("-5 * -3") == 15.0
-    assert calculator("10 - -5") == 15.0
 
+# ============================================================================
+# Calculator Tests
+# ============================================================================
 
-def test_calculator_decimals():
-    """Test calculator with decimal numbers."""
-    result = calculator("0.1 + 0.2")
-    assert abs(result - 0.3) < 0.0001  # Floating point tolerance
-    assert calculator("5.5 * 2") == 11.0
+@pytest.mark.parametrize("expression, expected", [
+    # Basic operations
+    ("2 + 2", 4.0),
+    ("10 * 5", 50.0),
+    ("100 / 4", 25.0),
+    ("10 - 3", 7.0),
+    ("10 % 3", 1.0),
+    # Grouping
+    ("(2 + 3) * 4", 20.0),
+    ("10 / (2 + 3)", 2.0),
+    # Negative numbers
+    ("-5 + 3", -2.0),
+    ("-5 * -3", 15.0),
+    ("10 - -5", 15.0),
+    # Decimals, compared with floating point tolerance
+    ("0.1 + 0.2", 0.3),
+    ("5.5 * 2", 11.0),
+    # Powers within the limits
+    ("2 ** 10", 1024.0),
+    ("10 ** 2", 100.0),
+])
+def test_calculator_expressions(expression, expected):
+    """Test calculator evaluates valid expressions."""
+    assert calculator(expression) == pytest.approx(expected)
+
+
+@pytest.mark.parametrize("expression, expected", [
+    ("5", 5.0),
+    ("-3.14", -3.14),
+    ("42 ", 42.0),
+    ("00.5", 0.5),  # Not a fast-path literal, still parsed
+    ("-0", 0.0),  # Negating integer zero gives zero, as when parsed
+    ("-0.0", -0.0),
+])
+def test_calculator_literals(expression, expected):
+    """Test plain number expressions evaluate to their value."""
+    result = calculator(expression)
+    assert result == expected
+    # == treats 0.0 and -0.0 as equal, so compare the sign too
+    assert math.copysign(1, result) == math.copysign(1, expected)
+
+
+@pytest.mark.parametrize("expression", ["007", " 42", " 4 + 2"])
+def test_calculator_literal_rejected_like_parsed(expression):
+    """Test literals Python would not parse, leading zeros or indentation, stay invalid."""
+    with pytest.raises(ValueError, match="Invalid expression"):
+        calculator(expression)
+
+
+def test_calculator_caches_results():
+    """Test repeated expressions are served from the cache."""
+    calculator.cache_clear()
+    assert calculator("6 * 7") == 42.0
+    assert calculator("6 * 7") == 42.0
+    info = calculator.cache_info()
+    assert info.hits == 1
+    assert info.misses == 1
 
 
 def test_calculator_division_by_zero():
@@ -47,10 +131,6 @@ def test_calculator_division_by_zero():
 
 def test_calculator_power_limits():
     """Test calculator limits power operations to prevent DoS."""
-    # Should work for reasonable powers
-    assert calculator("2 ** 10") == 1024.0
-    assert calculator("10 ** 2") == 100.0
-    
     # Should reject large base
     with pytest.raises(ValueError, match="Power operation values too large"):
         calculator("9999 ** 2")
@@ -95,6 +175,20 @@ def test_calculator_nested_parentheses():
 
 
 
+def test_calculator_depth_limit():
+    """Test calculator rejects operator chains nested past the depth limit."""
+    assert calculator("-" * 50 + "1") == 1.0
+    with pytest.raises(ValueError, match="too complex"):
+        calculator("-" * 60 + "1")
+
+
+def test_calculator_rejects_operators_before_evaluating():
+    """Test unsupported operators fail validation before any value is computed."""
+    # Evaluating would divide by zero; validation must reject // first
+    with pytest.raises(ValueError, match="Unsupported operation: FloorDiv"):
+        calculator("1 // 0")
+
+
 def test_calculator_invalid():
     """Test calculator with invalid input."""
     with pytest.raises(ValueError, match="invalid characters"):
@@ -111,63 +205,91 @@ def test_calculator_invalid():
 # DateTime Tests
 # ============================================================================
 
-def test_get_datetime_default():
+def test_get_datetime_default(frozen_now):
     """Test get_datetime with default format."""
-    result = get_datetime()
-    # Should return ISO format (contains 'T')
-    assert 'T' in result
+    assert get_datetime() == "2025-01-15T12:34:56"
 
 
-def test_get_datetime_custom_format():
+def test_get_datetime_custom_format(frozen_now):
     """Test get_datetime with custom format."""
-    result = get_datetime(format="%Y-%m-%d")
-    # Should match YYYY-MM-DD pattern
-    assert len(result) == 10
-    assert result[4] == '-' and result[7] == '-'
+    assert get_datetime(format="%Y-%m-%d") == "2025-01-15"
 
 
-def test_get_datetime_various_formats():
+@pytest.mark.parametrize("fmt, expected", [
+    ("%Y", "2025"),
+    ("%H:%M:%S", "12:34:56"),
+    ("%B %d, %Y", "January 15, 2025"),
+])
+def test_get_datetime_various_formats(frozen_now, fmt, expected):
     """Test get_datetime with various format strings."""
-    # Test that various formats work
-    result = get_datetime(format="%Y")
-    assert len(result) == 4  # Just the year
-    
-    result = get_datetime(format="%H:%M:%S")
-    assert len(result) == 8  # HH:MM:SS
-    
-    result = get_datetime(format="%B %d, %Y")
-    # Should be like "December 25, 2025"
-    assert "," in result
+    assert get_datetime(format=fmt) == expected
 
 
-def test_get_datetime_empty_format():
+def test_get_datetime_empty_format(frozen_now):
     """Test get_datetime with empty format string."""
-    result = get_datetime(format="")
-    # Empty format in strftime returns empty string
-    assert result == "" or isinstance(result, str)
+    # An empty format is falsy, so the ISO default applies
+    assert get_datetime(format="") == "2025-01-15T12:34:56"
 
 
-def test_get_datetime_timezone_parameter():
-    """Test that timezone parameter is accepted but ignored."""
-    # Should not raise error even though timezone isn't supported
-    result = get_datetime(timezone="UTC")
-    assert 'T' in result  # Still returns ISO format
+def test_get_datetime_timezone(frozen_now):
+    """Test a timezone name is applied to the current time."""
+    assert get_datetime(timezone="UTC") == "2025-01-15T12:34:56+00:00"
+    assert get_datetime(format="%Z", timezone="UTC") == "UTC"
+
+
+def test_get_datetime_unknown_timezone():
+    """Test unknown or malformed timezone names are rejected."""
+    with pytest.raises(ValueError, match="Unknown timezone"):
+        get_datetime(timezone="Nowhere/Special")
+    with pytest.raises(ValueError, match="Unknown timezone"):
+        get_datetime(timezone="../etc")
 
 
 # ============================================================================
 # Shell Command Tests
 # ============================================================================
 
-def test_shell_command_basic():
-    """Test basic shell command execution."""
+@patch("tools.subprocess.Popen", return_value=_completed(stdout=b"caf\xc3\xa9 \xff\n"))
+def test_shell_command_decodes_output(mock_run):
+    """Test output is decoded as UTF-8 with invalid bytes replaced."""
+    assert shell_command("cat file") == "café \ufffd\n"
+
+
+@patch("tools.subprocess.Popen", return_value=_completed(stdout=b"a\r\nb\rc\n"))
+def test_shell_command_normalizes_newlines(mock_run):
+    """Test Windows and old Mac line endings reach the model as \\n."""
+    assert shell_command("cat file") == "a\nb\nc\n"
+
+
+@patch("tools.subprocess.Popen", return_value=_completed())
+def test_shell_command_log_redacts_secrets(mock_run, info_logs):
+    """Test logged commands have secret values redacted."""
+    shell_command("echo token=abc123")
+
+    assert "token=***REDACTED***" in info_logs.text
+    assert "abc123" not in info_logs.text
+
+
+@patch("tools.subprocess.Popen", side_effect=OSError("cannot execute /usr/local/bin/tool"))
+def test_shell_command_error_hides_paths(mock_run):
+    """Test paths are scrubbed from execution failure messages."""
+    with pytest.raises(RuntimeError, match=r"cannot execute \[PATH\]"):
+        shell_command("tool")
+
+
+def test_shell_command_smoke():
+    """Test a real shell command runs end to end."""
     result = shell_command("echo hello")
     assert "hello" in result
 
 
-def test_shell_command_with_output():
-    """Test shell command that produces output."""
-    result = shell_command("echo test123")
-    assert "test123" in result
+@patch("tools.subprocess.Popen", return_value=_completed(stdout="hello\n"))
+def test_shell_command_basic(mock_run):
+    """Test basic shell command execution."""
+    result = shell_command("echo hello")
+    assert "hello" in result
+    assert mock_run.call_args.args == ("echo hello",)
+    assert mock_run.call_args.kwargs["env"] is tools._SHELL_ENV
 
 
 def test_shell_command_empty():
@@ -180,25 +302,60 @@ def test_shell_command_empty():
 
 def test_shell_command_timeout():
     """Test shell command timeout behavior."""
+    # Raise the timeout straight from wait instead of waiting on a real sleep
+    process = _FakeProcess(wait_error=subprocess.TimeoutExpired("sleep 5", 1))
+    with patch("tools.subprocess.Popen", return_value=process):
+        with pytest.raises(TimeoutError, match="timed out after 1 seconds"):
+            shell_command("sleep 5", timeout=1)
+    assert process.killed
+
+
+def test_shell_command_kills_process_on_other_errors():
+    """Test the child is killed when waiting fails with a non-timeout error."""
+    process = _FakeProcess(wait_error=OSError("wait failed"))
+    with patch("tools.subprocess.Popen", return_value=process):
+        with pytest.raises(RuntimeError, match="wait failed"):
+            shell_command("sleep 5")
+    assert process.killed
+
+
+@patch("tools.subprocess.Popen", return_value=_completed(stdout="done\n"))
+def test_shell_command_string_timeout(mock_popen):
+    """Test a numeric string timeout is accepted, as tool arguments may be strings."""
+    assert shell_command("sleep 3", timeout="5") == "done\n"
+
+
+@patch("tools.subprocess.Popen")
+def test_shell_command_invalid_timeout(mock_popen):
+    """Test a non-numeric timeout is rejected before any process starts."""
+    with pytest.raises(ValueError, match="Invalid timeout"):
+        shell_command("sleep 3", timeout="soon")
+    mock_popen.assert_not_called()
+
+
+@pytest.mark.slow
+def test_shell_command_timeout_real():
+    """Test a real command is killed once its timeout expires."""
     with pytest.raises(TimeoutError, match="timed out"):
-        shell_command("sleep 5", timeout=1)
+        shell_command("sleep 5", timeout=0.1)
 
 
-def test_shell_command_nonzero_exit():
+@patch("tools.subprocess.Popen", return_value=_completed(returncode=1))
+def test_shell_command_nonzero_exit(mock_run):
     """Test shell command with non-zero exit code."""
-    # Use a simple command that fails without dangerous patterns
     result = shell_command("exit 1")
     # Should capture exit code
     assert "exit code: 1" in result
 
 
-def test_shell_command_stderr():
+@patch("tools.subprocess.Popen", return_value=_completed(
+    stderr="ls: unrecognized option '--invalid-option'\n", returncode=2))
+def test_shell_command_stderr(mock_run):
     """Test shell command that outputs to stderr."""
-    # Use a command that doesn't trigger security filters
-    # Most commands naturally write errors to stderr when they fail
     result = shell_command("ls --invalid-option")
-    # Should capture stderr or exit code
-    assert "[stderr]" in result or "exit code" in result or "unrecognized" in result.lower()
+    assert "[stderr]" in result
+    assert "unrecognized" in result
+    assert "[exit code: 2]" in result
 
 
 
@@ -240,12 +397,45 @@ def test_shell_command_dangerous_commands():
         shell_command("rm -rf /tmp")
 
 
-def test_shell_command_output_size_limit():
+def test_dangerous_patterns_are_precompiled():
+    """Test the injection patterns are compiled once at module level."""
+    assert tools._DANGEROUS_PATTERNS
+    assert all(isinstance(p, re.Pattern) for p in tools._DANGEROUS_PATTERNS)
+
+
+def test_dangerous_pattern_reports_first_listed_match():
+    """Test the fused scan reports the first listed pattern, not the leftmost match."""
+    with pytest.raises(ValueError) as exc_info:
+        shell_command("cat > /dev/null; ls")
+    assert str(exc_info.value).endswith(tools._DANGEROUS_PATTERNS[0].pattern)
+
+
+@patch("tools.subprocess.Popen", return_value=_completed(stdout="x" * 200000))
+def test_shell_command_output_size_limit(mock_run):
     """Test shell command limits output size."""
-    # Generate large output (but command itself is safe)
     result = shell_command("python3 -c \"print('x' * 200000)\"")
     # Output should be truncated
-    assert "[output truncated]" in result or len(result) < 150000
+    assert "[output truncated]" in result
+    assert len(result) < 150000
+
+
+def test_shell_command_small_output_is_not_copied():
+    """Test output under the limit is kept as the chunk that was read."""
+    data = b"hello\n" * 10
+    captured = []
+    tools._drain_capped(io.BytesIO(data), captured)
+
+    assert captured == [data, False]
+
+
+def test_shell_command_stops_keeping_output_at_limit():
+    """Test output past the limit is drained from the pipe but not kept."""
+    stream = io.BytesIO(b"x" * (tools._MAX_OUTPUT_BYTES * 3))
+    captured = []
+    tools._drain_capped(stream, captured)
+
+    assert captured == [b"x" * tools._MAX_OUTPUT_BYTES, True]
+    assert stream.closed
 
 
 # ============================================================================
@@ -274,6 +464,17 @@ def test_tool_to_schema():
     assert "properties" in schema["function"]["parameters"]
 
 
+def test_tool_has_no_instance_dict(tool_registry):
+    """Test Tool stores its fields in slots rather than a per-instance dict."""
+    assert not hasattr(tool_registry["calculator"], "__dict__")
+
+
+def test_tool_schema_is_cached():
+    """Test to_schema builds the schema once and reuses it."""
+    tool = Tool(name="test_tool", description="A test tool", parameters={}, function=lambda: None)
+    assert tool.to_schema() is tool.to_schema()
+
+
 def test_tool_execute():
     """Test Tool execution."""
     tool = Tool(
@@ -287,6 +488,28 @@ def test_tool_execute():
     assert result == "8"
 
 
+def test_parse_arguments(json_backend):
+    """Test tool arguments parse the same with either JSON backend."""
+    assert tools.parse_arguments('{"x": 5, "y": "a"}') == {"x": 5, "y": "a"}
+    assert tools.parse_arguments("") == {}
+    parsed = {"x": 5}
+    assert tools.parse_arguments(parsed) is parsed
+    with pytest.raises(json.JSONDecodeError):
+        tools.parse_arguments("not valid json")
+
+
+def test_tool_execute_dict_arguments():
+    """Test Tool execution with already-parsed arguments."""
+    tool = Tool(
+        name="test_tool",
+        description="A test tool",
+        parameters={},
+        function=lambda x, y: x + y
+    )
+
+    assert tool.execute({"x": 5, "y": 3}) == "8"
+
+
 def test_tool_execute_error():
     """Test Tool execution with error."""
     tool = Tool(
@@ -340,13 +563,42 @@ def test_tool_execute_extra_params():
     assert "Error" in result or result == "10"  # Depends on how kwargs are handled
 
 
+def test_tool_execute_drops_undeclared_params():
+    """Test arguments the schema does not declare are ignored."""
+    tool = Tool(
+        name="test_tool",
+        description="A test tool",
+        parameters={"type": "object", "properties": {"x": {"type": "integer"}}},
+        function=lambda x: x * 2
+    )
+
+    assert tool.execute('{"x": 5, "extra": "ignored"}') == "10"
+
+
+@pytest.mark.parametrize("arguments", ["", "{}", None])
+def test_tool_execute_empty_arguments_skip_parsing(monkeypatch, arguments):
+    """Test tools without required parameters run empty calls without parsing."""
+    def fail_parse(arguments):
+        raise AssertionError("arguments were parsed")
+
+    monkeypatch.setattr(tools, "parse_arguments", fail_parse)
+    tool = Tool(
+        name="test_tool",
+        description="A test tool",
+        parameters={"type": "object", "properties": {}, "required": []},
+        function=lambda: "ran"
+    )
+
+    assert tool.execute(arguments) == "ran"
+
+
 # ============================================================================
 # Registry Tests
 # ============================================================================
 
-def test_create_tool_registry():
+def test_create_tool_registry(tool_registry):
     """Test tool registry creation."""
-    tools = create_tool_registry()
+    tools = tool_registry
     
     # Check that all expected tools are present
     assert "calculator" in tools
@@ -359,9 +611,16 @@ def test_create_tool_registry():
     assert isinstance(tools["shell_command"], Tool)
 
 
-def test_tool_registry_schemas():
+def test_create_tool_registry_is_shared_and_read_only(tool_registry):
+    """Test every caller gets the same prebuilt registry, which cannot be mutated."""
+    assert create_tool_registry() is tool_registry
+    with pytest.raises(TypeError):
+        tool_registry["extra"] = tool_registry["calculator"]
+
+
+def test_tool_registry_schemas(tool_registry):
     """Test that all tools can generate valid schemas."""
-    tools = create_tool_registry()
+    tools = tool_registry
     
     for tool_name, tool in tools.items():
         schema = tool.to_schema()
@@ -372,18 +631,18 @@ def test_tool_registry_schemas():
         assert "parameters" in schema["function"]
 
 
-def test_calculator_tool_execution():
+def test_calculator_tool_execution(tool_registry):
     """Test calculator tool through tool registry."""
-    tools = create_tool_registry()
+    tools = tool_registry
     calc_tool = tools["calculator"]
     
     result = calc_tool.execute('{"expression": "5 * 5"}')
     assert result == "25.0"
 
 
-def test_datetime_tool_execution():
+def test_datetime_tool_execution(tool_registry):
     """Test datetime tool through tool registry."""
-    tools = create_tool_registry()
+    tools = tool_registry
     dt_tool = tools["get_datetime"]
     
     result = dt_tool.execute('{}')
@@ -391,9 +650,9 @@ def test_datetime_tool_execution():
     assert 'T' in result
 
 
-def test_shell_tool_execution():
+def test_shell_tool_execution(tool_registry):
     """Test shell tool through tool registry."""
-    tools = create_tool_registry()
+    tools = tool_registry
     shell_tool = tools["shell_command"]
     
     result = shell_tool.execute('{"command": "echo test"}')
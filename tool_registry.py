@@ -5,11 +5,11 @@ This module provides a single interface for accessing both local tools
 (calculator, datetime, shell) and dynamically discovered MCP tools.
 """
 
-import json
+import asyncio
 import logging
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple, Union
 
-from tools import create_tool_registry as create_local_tool_registry
+from tools import create_tool_registry as create_local_tool_registry, parse_arguments
 
 logger = logging.getLogger(__name__)
 
@@ -25,19 +25,54 @@ class ToolRegistry:
             mcp_manager: Optional MCPManager instance for MCP tools
         """
         self.local_tools = create_local_tool_registry()
+        # Local tools are fixed for the registry's lifetime, so precompute
+        # their schemas, bound execute methods and info dicts
+        self._local_schemas = [tool.to_schema() for tool in self.local_tools.values()]
+        self._local_execute = {name: tool.execute for name, tool in self.local_tools.items()}
+        self._local_info = {
+            name: {
+                "name": name,
+                "type": "local",
+                "description": tool.description,
+                "parameters": tool.parameters
+            }
+            for name, tool in self.local_tools.items()
+        }
         self.mcp_manager = mcp_manager
+        self._reset_cache()
         
     def set_mcp_manager(self, mcp_manager):
         """Set or update the MCP manager."""
         self.mcp_manager = mcp_manager
+        self._reset_cache()
+        
+    def _reset_cache(self):
+        """Drop the merged tool map and schema list."""
+        self._all_tools_cache = None
+        self._schemas_cache = None
+        self._cache_version = self.mcp_manager.version if self.mcp_manager else None
+        
+    def _check_cache(self):
+        """Invalidate cached results if the MCP manager's tools changed."""
+        version = self.mcp_manager.version if self.mcp_manager else None
+        if version != self._cache_version:
+            self._reset_cache()
         
     def get_all_tools(self) -> Dict[str, Any]:
         """
         Get all available tools (local + MCP).
         
+        The result is cached until the MCP manager's tools change, so
+        callers must not modify it.
+        
         Returns:
-            Dictionary mapping tool names to tool objects
+            Dictionary mapping tool names to local Tool objects and
+            MCPToolEntry records
         """
+        self._check_cache()
+        if self._all_tools_cache is not None:
+            return self._all_tools_cache
+            
         all_tools = {}
         
         # Add local tools
@@ -46,62 +81,82 @@ class ToolRegistry:
         # Add MCP tools if manager is available
         if self.mcp_manager:
             mcp_tools = self.mcp_manager.get_all_tools()
-            for tool_name, tool_info in mcp_tools.items():
-                # Store tool info with marker that it's from MCP
-                all_tools[tool_name] = {
-                    "type": "mcp",
-                    "server": tool_info["server"],
-                    "description": tool_info["description"],
-                    "tool": tool_info["tool"]
-                }
+            # MCPToolEntry records carry type "mcp" to mark where they came from
+            all_tools.update(mcp_tools)
                 
+        self._all_tools_cache = all_tools
         return all_tools
         
     def get_tool_schemas(self) -> List[Dict[str, Any]]:
         """
         Get OpenAI-format schemas for all tools.
         
+        The list is cached until the MCP manager's tools change, so callers
+        must not modify it.
+        
         Returns:
             List of tool schemas in OpenAI function calling format
         """
-        schemas = []
-        
-        # Add local tool schemas
-        for tool in self.local_tools.values():
-            schemas.append(tool.to_schema())
+        self._check_cache()
+        if self._schemas_cache is not None:
+            return self._schemas_cache
+            
+        schemas = list(self._local_schemas)
             
         # Add MCP tool schemas
         if self.mcp_manager:
             schemas.extend(self.mcp_manager.get_tool_schemas())
             
+        self._schemas_cache = schemas
         return schemas
         
-    async def execute_tool(self, tool_name: str, arguments: str) -> str:
+    async def execute_tool(self, tool_name: str, arguments: Union[str, Dict[str, Any]]) -> str:
         """
         Execute a tool by name with given arguments.
         
         Args:
             tool_name: Name of the tool to execute
-            arguments: JSON string of arguments
+            arguments: JSON string of arguments, or an already-parsed dict
             
         Returns:
             Tool execution result as string
         """
-        # Check if it's a local tool
-        if tool_name in self.local_tools:
-            return self.local_tools[tool_name].execute(arguments)
+        # Check if it's a local tool; run it in the thread pool since tools
+        # like shell_command block for up to their timeout
+        execute = self._local_execute.get(tool_name)
+        if execute is not None:
+            return await asyncio.to_thread(execute, arguments)
             
         # Check if it's an MCP tool
-        if tool_name.startswith("mcp_") and self.mcp_manager:
+        if self.mcp_manager and self.mcp_manager.has_tool(tool_name):
             try:
-                args_dict = json.loads(arguments)
+                args_dict = parse_arguments(arguments)
                 return await self.mcp_manager.call_tool(tool_name, args_dict)
             except Exception as e:
-                logger.error(f"Error executing MCP tool {tool_name}: {e}", exc_info=True)
+                logger.error("Error executing MCP tool %s: %s", tool_name, e, exc_info=True)
                 return f"Error: {str(e)}"
                 
         return f"Error: Unknown tool '{tool_name}'"
         
+    async def execute_tools_batch(self, calls: List[Tuple[str, str]]) -> List[str]:
+        """
+        Execute several tool calls concurrently.
+        
+        Args:
+            calls: (tool_name, arguments) pairs, as returned in one LLM turn
+            
+        Returns:
+            Tool execution results as strings, in the same order as calls
+        """
+        results = await asyncio.gather(
+            *(self.execute_tool(name, arguments) for name, arguments in calls),
+            return_exceptions=True
+        )
+        return [
+            f"Error: {str(result)}" if isinstance(result, Exception) else result
+            for result in results
+        ]
+        
     def list_tools(self, server_filter: Optional[str] = None) -> List[str]:
         """
         List all available tool names.
@@ -133,28 +188,23 @@ class ToolRegistry:
             tool_name: Name of the tool
             
         Returns:
-            Tool information dictionary or None if not found
+            Tool information dictionary or None if not found. Local tool info
+            is shared between calls, so callers must not modify it.
         """
         # Check local tools
-        if tool_name in self.local_tools:
-            tool = self.local_tools[tool_name]
-            return {
-                "name": tool_name,
-                "type": "local",
-                "description": tool.description,
-                "parameters": tool.parameters
-            }
+        info = self._local_info.get(tool_name)
+        if info is not None:
+            return info
             
         # Check MCP tools
-        if tool_name.startswith("mcp_") and self.mcp_manager:
-            all_mcp_tools = self.mcp_manager.get_all_tools()
-            if tool_name in all_mcp_tools:
-                tool_info = all_mcp_tools[tool_name]
+        if self.mcp_manager:
+            tool_info = self.mcp_manager.get_tool(tool_name)
+            if tool_info is not None:
                 return {
                     "name": tool_name,
                     "type": "mcp",
-                    "server": tool_info["server"],
-                    "description": tool_info["description"]
+                    "server": tool_info.server,
+                    "description": tool_info.description
                 }
                 
         return None
@@ -5,22 +5,105 @@ This module defines callable tools that the LLM can use to perform specific task
 Each tool is defined with its function, schema, and execution logic.
 """
 
+import functools
 import json
 import subprocess
 import shlex
 from datetime import datetime
-from typing import Any, Dict, List, Callable
+from types import MappingProxyType
+from typing import Any, Dict, List, Callable, Mapping, Union
 import logging
 import ast
 import operator
 import re
+import sys
+import threading
+import time
+
+# orjson is optional and imported here only; session.py reads tools.orjson
+# too, so both tool arguments and session files switch parsers together
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    from zoneinfo import ZoneInfo
+except ImportError:  # Python < 3.9; get_datetime falls back to local time
+    ZoneInfo = None
 
 logger = logging.getLogger(__name__)
 
+# Bound once so get_datetime skips the class attribute lookup per call
+_datetime_now = datetime.now
+
+# Characters a calculator expression may contain, and a table deleting them;
+# anything left after translate() is an invalid character
+_ALLOWED_CHARS = frozenset("0123456789+-*/()%. ")
+_STRIP_TABLE = str.maketrans("", "", "".join(_ALLOWED_CHARS))
+
+# A lone integer or decimal literal, optionally negated, that ast.parse
+# would accept as-is: no leading zeros on integers and no leading
+# whitespace (an "unexpected indent"). These skip the AST path
+_NUMBER_RE = re.compile(r'-?(?:0|[1-9]\d*)(?:\.\d+)?\s*\Z')
+
+# Shell patterns that could enable command injection, compiled once at import
+_DANGEROUS_PATTERNS = [
+    re.compile(r'[;&|`$]'),       # Command chaining/substitution
+    re.compile(r'\$\('),          # Command substitution
+    re.compile(r'>\s*/dev'),      # Writing to device files
+    re.compile(r'rm\s+-rf\s+/'),  # Dangerous rm commands
+]
+
+# All of the above fused into one alternation, so safe commands are scanned
+# once instead of once per pattern
+_DANGER_RE = re.compile("|".join(f"(?:{p.pattern})" for p in _DANGEROUS_PATTERNS))
+
+# Bytes kept from each of a shell command's output streams, and the size
+# of each pipe read
+_MAX_OUTPUT_BYTES = 100000  # 100KB
+_READ_CHUNK = 65536
+
+# Environment for shell commands: a restricted PATH and nothing else.
+# Without LANG or LC_* set the child already runs in the C locale
+_SHELL_ENV = {'PATH': '/usr/bin:/bin'}
+
+# Secret assignments redacted from logged commands
+_SECRET_RE = re.compile(r'(password|passwd|pwd|secret|token|key|auth)[\s=:]+\S+', re.IGNORECASE)
+
+# File paths scrubbed from shell error messages
+_PATH_RE = re.compile(r'/[a-zA-Z0-9/_\-\.]+')
+
+
+# Argument payloads that mean "no arguments"
+_EMPTY_ARGUMENTS = ("", "{}", None)
+
+
+def parse_arguments(arguments: Union[str, Dict, None]) -> Dict:
+    """
+    Parse a tool call's JSON arguments, using orjson when installed.
+
+    Already-parsed dicts are returned as-is and empty arguments become an
+    empty dict, so neither round-trips through the JSON parser. Malformed
+    JSON raises json.JSONDecodeError whichever parser is used.
+    """
+    if isinstance(arguments, dict):
+        return arguments
+    if not arguments:
+        return {}
+    if orjson is not None:
+        return orjson.loads(arguments)
+    return json.loads(arguments)
+
 
 class Tool:
     """Represents a callable tool that can be used by the LLM."""
 
+    __slots__ = (
+        "name", "description", "parameters", "function",
+        "_schema", "_no_required_args", "_param_names",
+    )
+
     def __init__(self, name: str, description: str, parameters: Dict, function: Callable):
         """
         Initialize a tool.
@@ -31,47 +114,182 @@ class Tool:
             parameters: JSON schema for the tool's parameters
             function: The Python function to execute
         """
-        self.name = name
+        # Interned so registry keys and schema names share one string object
+        self.name = sys.intern(name)
         self.description = description
         self.parameters = parameters
         self.function = function
-
-    def to_schema(self) -> Dict:
-        """Convert tool to OpenAI function calling schema."""
-        return {
+        # Name, description and parameters never change, so build the schema once
+        self._schema = {
             "type": "function",
             "function": {
                 "name": self.name,
-                "description": self.description,
-                "parameters": self.parameters
+                "description": description,
+                "parameters": parameters
             }
         }
+        # Tools with no required parameters can skip parsing empty arguments
+        self._no_required_args = not parameters.get("required")
+        # Declared parameter names; undeclared arguments are dropped before the call
+        self._param_names = frozenset(parameters.get("properties", ()))
+
+    def to_schema(self) -> Dict:
+        """Convert tool to OpenAI function calling schema."""
+        return self._schema
 
-    def execute(self, arguments: str) -> str:
+    def execute(self, arguments: Union[str, Dict]) -> str:
         """
         Execute the tool with given arguments.
 
         Args:
-            arguments: JSON string of arguments
+            arguments: JSON string of arguments, or an already-parsed dict.
+                Arguments the schema does not declare are ignored.
 
         Returns:
             Result as string
         """
         try:
-            args = json.loads(arguments)
+            if self._no_required_args and arguments in _EMPTY_ARGUMENTS:
+                return str(self.function())
+            args = parse_arguments(arguments)
+            if self._param_names:
+                args = {k: v for k, v in args.items() if k in self._param_names}
             result = self.function(**args)
             return str(result)
         except Exception as e:
-            logger.error(f"Tool {self.name} execution error: {e}", exc_info=True)
+            logger.error("Tool %s execution error: %s", self.name, e, exc_info=True)
             return f"Error: {str(e)}"
 
 
+# Calculator evaluation
+
+# Safe operators mapping
+_SAFE_OPERATORS = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+    ast.Mod: operator.mod,
+    ast.Pow: operator.pow,
+    ast.USub: operator.neg,
+    ast.UAdd: operator.pos,
+}
+
+
+# Instruction kinds for compiled expressions
+_PUSH, _UNARY, _BINARY = range(3)
+
+# Operator node types, compared by identity while compiling
+_BIN_OP, _UNARY_OP = ast.BinOp, ast.UnaryOp
+
+# Literal node type -> value getter
+_CONSTANT_GETTERS = {ast.Constant: operator.attrgetter("value")}
+if sys.version_info < (3, 8):  # Numbers parse to ast.Num before Python 3.8
+    _CONSTANT_GETTERS[ast.Num] = operator.attrgetter("n")
+
+
+def _resolve_operator(op_type) -> Callable:
+    """Return the function for a whitelisted operator node type."""
+    op = _SAFE_OPERATORS.get(op_type)
+    if op is None:
+        raise ValueError(f"Unsupported operation: {op_type.__name__}")
+    return op
+
+
+def _compile_expression(node) -> List[tuple]:
+    """
+    Flatten an expression AST into postfix (kind, payload) instructions.
+
+    Walks the tree with an explicit stack instead of recursion, enforcing
+    the same nesting limit the recursive evaluator did. This is also the
+    validation pass: unsupported nodes and operators are rejected here, and
+    operators are emitted as their resolved functions.
+    """
+    code = []
+    pending = [(node, 0, False)]
+    while pending:
+        node, depth, children_done = pending.pop()
+        # Limit nesting depth to prevent DoS
+        if depth > 50:
+            raise ValueError("Expression too complex (max depth: 50)")
+
+        node_type = type(node)
+        getter = _CONSTANT_GETTERS.get(node_type)
+        if getter is not None:
+            code.append((_PUSH, getter(node)))
+        elif node_type is _BIN_OP:
+            if children_done:
+                code.append((_BINARY, _resolve_operator(type(node.op))))
+            else:
+                pending.append((node, depth, True))
+                pending.append((node.right, depth + 1, False))
+                pending.append((node.left, depth + 1, False))
+        elif node_type is _UNARY_OP:
+            if children_done:
+                code.append((_UNARY, _resolve_operator(type(node.op))))
+            else:
+                pending.append((node, depth, True))
+                pending.append((node.operand, depth + 1, False))
+        else:
+            raise ValueError(f"Unsupported node type: {node_type.__name__}")
+    return code
+
+
+def _apply_binop(op, left, right):
+    """
+    Apply a whitelisted binary operator function with the value-dependent
+    power, division and overflow guards.
+    """
+    # Special handling for power to prevent DoS
+    if op is operator.pow:
+        # Limit base and exponent to reasonable values
+        if abs(left) > 1000 or abs(right) > 100:
+            raise ValueError("Power operation values too large (base max: 1000, exponent max: 100)")
+
+    # Check for division by zero
+    if op is operator.truediv and right == 0:
+        raise ValueError("Division by zero")
+
+    result = op(left, right)
+
+    # Check for overflow
+    if abs(result) > 1e100:
+        raise ValueError("Result too large (overflow)")
+
+    return result
+
+
+def _run_expression(code: List[tuple]):
+    """
+    Evaluate compiled postfix instructions with a value stack.
+
+    Operators were validated and resolved at compile time, so only the
+    value-dependent guards in _apply_binop run here.
+    """
+    stack = []
+    push, pop = stack.append, stack.pop
+    apply_binop = _apply_binop
+    for kind, payload in code:
+        if kind == _PUSH:
+            push(payload)
+        elif kind == _BINARY:
+            right = pop()
+            stack[-1] = apply_binop(payload, stack[-1], right)
+        else:
+            stack[-1] = payload(stack[-1])
+    return stack[0]
+
+
 # Tool function implementations
 
+@functools.lru_cache(maxsize=1024)
 def calculator(expression: str) -> float:
     """
     Evaluate a mathematical expression using AST parsing for safety.
 
+    Results are cached per expression string, since evaluation is pure and
+    the LLM often repeats the same calculation.
+
     Args:
         expression: Mathematical expression to evaluate (e.g., "2 + 2", "10 * 5")
 
@@ -79,73 +297,25 @@ def calculator(expression: str) -> float:
         Result of the calculation
     """
     # Sanitize input - only allow numbers, basic operators, parentheses, and whitespace
-    allowed_chars = set("0123456789+-*/()%. ")
-    if not all(c in allowed_chars for c in expression):
+    if expression.translate(_STRIP_TABLE):
         raise ValueError("Expression contains invalid characters")
     
     # Limit expression length to prevent DoS
     if len(expression) > 200:
         raise ValueError("Expression too long (max 200 characters)")
 
-    # Safe operators mapping
-    safe_operators = {
-        ast.Add: operator.add,
-        ast.Sub: operator.sub,
-        ast.Mult: operator.mul,
-        ast.Div: operator.truediv,
-        ast.Mod: operator.mod,
-        ast.Pow: operator.pow,
-        ast.USub: operator.neg,
-        ast.UAdd: operator.pos,
-    }
-
-    def eval_node(node, depth=0):
-        """Recursively evaluate AST nodes."""
-        # Limit recursion depth to prevent DoS
-        if depth > 50:
-            raise ValueError("Expression too complex (max depth: 50)")
-            
-        if isinstance(node, ast.Constant):  # Python 3.8+
-            return node.value
-        elif isinstance(node, ast.Num):  # Fallback for older Python
-            return node.n
-        elif isinstance(node, ast.BinOp):
-            left = eval_node(node.left, depth + 1)
-            right = eval_node(node.right, depth + 1)
-            op_type = type(node.op)
-            if op_type not in safe_operators:
-                raise ValueError(f"Unsupported operation: {op_type.__name__}")
-            
-            # Special handling for power to prevent DoS
-            if op_type == ast.Pow:
-                # Limit base and exponent to reasonable values
-                if abs(left) > 1000 or abs(right) > 100:
-                    raise ValueError("Power operation values too large (base max: 1000, exponent max: 100)")
-            
-            # Check for division by zero
-            if op_type == ast.Div and right == 0:
-                raise ValueError("Division by zero")
-                
-            result = safe_operators[op_type](left, right)
-            
-            # Check for overflow
-            if abs(result) > 1e100:
-                raise ValueError("Result too large (overflow)")
-                
-            return result
-        elif isinstance(node, ast.UnaryOp):
-            operand = eval_node(node.operand, depth + 1)
-            op_type = type(node.op)
-            if op_type not in safe_operators:
-                raise ValueError(f"Unsupported operation: {op_type.__name__}")
-            return safe_operators[op_type](operand)
-        else:
-            raise ValueError(f"Unsupported node type: {type(node).__name__}")
+    # Plain numbers need neither parsing nor the safety walk. Integers go
+    # through int() as the parsed path does, so "-0" gives 0.0 while "-0.0"
+    # stays -0.0
+    if _NUMBER_RE.match(expression):
+        if "." in expression:
+            return float(expression)
+        return float(int(expression))
 
     try:
         # Parse expression into AST
         tree = ast.parse(expression, mode='eval')
-        result = eval_node(tree.body)
+        result = _run_expression(_compile_expression(tree.body))
         return float(result)
     except ZeroDivisionError:
         raise ValueError("Division by zero")
@@ -153,18 +323,32 @@ def calculator(expression: str) -> float:
         raise ValueError(f"Invalid expression: {e}")
 
 
+@functools.lru_cache(maxsize=32)
+def _zone(name: str):
+    """Load an IANA timezone once per name; ZoneInfo reads the tzdata file."""
+    try:
+        return ZoneInfo(name)
+    except (KeyError, ValueError):
+        # ZoneInfoNotFoundError is a KeyError; malformed keys raise ValueError
+        raise ValueError(f"Unknown timezone: {name}") from None
+
+
 def get_datetime(format: str = None, timezone: str = None) -> str:
     """
     Get current date and time.
 
     Args:
         format: Optional strftime format string (default: ISO 8601)
-        timezone: Optional timezone (not currently supported, uses local time)
+        timezone: Optional IANA timezone name such as "UTC" (default: local
+            time). Ignored on Pythons without zoneinfo.
 
     Returns:
         Formatted date/time string
     """
-    now = datetime.now()
+    if timezone and ZoneInfo is not None:
+        now = _datetime_now(_zone(timezone))
+    else:
+        now = _datetime_now()
 
     if format:
         try:
@@ -176,6 +360,64 @@ def get_datetime(format: str = None, timezone: str = None) -> str:
         return now.isoformat()
 
 
+def _drain_capped(stream, captured: List) -> None:
+    """
+    Read a pipe to EOF, keeping at most _MAX_OUTPUT_BYTES of it.
+
+    Everything past the limit is read and dropped so the child never blocks
+    on a full pipe. captured is filled with [kept bytes, truncated flag].
+    """
+    # Chunks are only sliced when they cross the limit, and joining a single
+    # chunk returns it as-is, so small outputs are never copied
+    chunks = []
+    room = _MAX_OUTPUT_BYTES
+    truncated = False
+    with stream:
+        for chunk in iter(functools.partial(stream.read, _READ_CHUNK), b""):
+            if len(chunk) <= room:
+                chunks.append(chunk)
+                room -= len(chunk)
+            else:
+                if room:
+                    chunks.append(chunk[:room])
+                    room = 0
+                truncated = True
+    captured[:] = [b"".join(chunks), truncated]
+
+
+def _capture_capped(process: subprocess.Popen, timeout: float):
+    """
+    Wait for process and return its ([stdout, truncated], [stderr, truncated]).
+
+    Both pipes are drained on background threads that keep only the first
+    _MAX_OUTPUT_BYTES of each, so memory stays bounded however much the
+    command prints. subprocess.TimeoutExpired is raised, as subprocess.run
+    would, if the process or its output outlives timeout. As with
+    subprocess.run, the process is killed and reaped on any exception,
+    including a timeout or KeyboardInterrupt.
+    """
+    stdout, stderr = [b"", False], [b"", False]
+    try:
+        readers = [
+            threading.Thread(target=_drain_capped, args=(process.stdout, stdout), daemon=True),
+            threading.Thread(target=_drain_capped, args=(process.stderr, stderr), daemon=True),
+        ]
+        for reader in readers:
+            reader.start()
+
+        deadline = time.monotonic() + timeout
+        process.wait(timeout=timeout)
+        for reader in readers:
+            reader.join(max(0.0, deadline - time.monotonic()))
+            if reader.is_alive():
+                raise subprocess.TimeoutExpired(process.args, timeout)
+    except BaseException:
+        process.kill()
+        process.wait()
+        raise
+    return stdout, stderr
+
+
 def shell_command(command: str, timeout: int = 30) -> str:
     """
     Execute a shell command with security restrictions.
@@ -198,52 +440,56 @@ def shell_command(command: str, timeout: int = 30) -> str:
             raise ValueError("Command too long (max 1000 characters)")
         
         # Check for dangerous patterns that could enable command injection
-        dangerous_patterns = [
-            r'[;&|`$]',  # Command chaining/substitution
-            r'\$\(',     # Command substitution
-            r'>\s*/dev', # Writing to device files
-            r'rm\s+-rf\s+/', # Dangerous rm commands
-        ]
-        
-        for pattern in dangerous_patterns:
-            if re.search(pattern, command):
-                raise ValueError(f"Command contains potentially dangerous pattern: {pattern}")
+        if _DANGER_RE.search(command):
+            # Report the first pattern in list order, as the per-pattern
+            # checks always did, not whichever matched leftmost
+            pattern = next(p for p in _DANGEROUS_PATTERNS if p.search(command))
+            raise ValueError(f"Command contains potentially dangerous pattern: {pattern.pattern}")
+
+        # Tool arguments may arrive as strings; reject anything non-numeric
+        # before a process is started
+        try:
+            wait_seconds = float(timeout)
+        except (TypeError, ValueError):
+            raise ValueError(f"Invalid timeout: {timeout!r}") from None
         
-        # Sanitize for logging - redact potential secrets
-        log_command = command
-        # Redact common secret patterns
-        log_command = re.sub(r'(password|passwd|pwd|secret|token|key|auth)[\s=:]+\S+', 
-                             r'\1=***REDACTED***', log_command, flags=re.IGNORECASE)
-        logger.info(f"Executing shell command: {log_command}")
+        # Sanitize for logging - redact potential secrets. Skip the redaction
+        # entirely when INFO records would be dropped anyway
+        if logger.isEnabledFor(logging.INFO):
+            # Redact common secret patterns
+            log_command = _SECRET_RE.sub(r'\1=***REDACTED***', command)
+            logger.info("Executing shell command: %s", log_command)
 
         # Execute with timeout and capture output using shell=False for better security
         # Note: We still use shell=True but with validation above for compatibility
         # A future improvement would be to parse and use subprocess without shell
-        result = subprocess.run(
+        process = subprocess.Popen(
             command,
             shell=True,
-            capture_output=True,
-            text=True,
-            timeout=timeout,
-            # Additional security: limit output size
-            env={'PATH': '/usr/bin:/bin'},  # Restricted PATH
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            env=_SHELL_ENV,
         )
+        stdout, stderr = _capture_capped(process, wait_seconds)
 
-        # Limit output size to prevent memory exhaustion
-        max_output_size = 100000  # 100KB
-        output = result.stdout[:max_output_size]
-        if len(result.stdout) > max_output_size:
-            output += "\n[output truncated]"
+        # Output is captured as bytes and only the kept part is decoded, once
+        parts = [stdout[0]]
+        if stdout[1]:
+            parts.append(b"\n[output truncated]")
             
-        if result.stderr:
-            stderr_limited = result.stderr[:max_output_size]
-            output += "\n[stderr]:\n" + stderr_limited
-            if len(result.stderr) > max_output_size:
-                output += "\n[stderr truncated]"
+        if stderr[0]:
+            parts.append(b"\n[stderr]:\n")
+            parts.append(stderr[0])
+            if stderr[1]:
+                parts.append(b"\n[stderr truncated]")
+        output = b"".join(parts).decode("utf-8", errors="replace")
+        # Translate \r\n and lone \r to \n, as text-mode capture used to
+        if "\r" in output:
+            output = output.replace("\r\n", "\n").replace("\r", "\n")
 
         # Include return code if non-zero
-        if result.returncode != 0:
-            output += f"\n[exit code: {result.returncode}]"
+        if process.returncode != 0:
+            output += f"\n[exit code: {process.returncode}]"
 
         return output if output else "(no output)"
 
@@ -256,20 +502,15 @@ def shell_command(command: str, timeout: int = 30) -> str:
         # Sanitize error message to avoid information disclosure
         error_msg = str(e)
         # Remove file paths from error messages
-        error_msg = re.sub(r'/[a-zA-Z0-9/_\-\.]+', '[PATH]', error_msg)
+        error_msg = _PATH_RE.sub('[PATH]', error_msg)
         raise RuntimeError(f"Command execution failed: {error_msg}")
 
 
 # Tool registry
 
-def create_tool_registry() -> Dict[str, Tool]:
-    """
-    Create and return the registry of available tools.
-
-    Returns:
-        Dictionary mapping tool names to Tool instances
-    """
-    tools = [
+def _build_local_tools() -> List[Tool]:
+    """Build the local Tool instances; called once at import."""
+    return [
         Tool(
             name="calculator",
             description="Evaluate mathematical expressions. USE THIS TOOL for: any arithmetic, calculations, percentages, unit conversions, tip calculations, splitting bills, computing totals, statistical calculations, or any question involving numbers and math. Supports +, -, *, /, %, parentheses, and decimals. Examples: '15% of 85', '(100 + 50) / 3', '2.5 * 4'",
@@ -297,7 +538,7 @@ def create_tool_registry() -> Dict[str, Tool]:
                     },
                     "timezone": {
                         "type": "string",
-                        "description": "Optional timezone (not currently supported, uses local time)"
+                        "description": "Optional IANA timezone name, e.g. 'UTC' or 'America/New_York'. Leave empty for local time."
                     }
                 },
                 "required": []
@@ -325,4 +566,18 @@ def create_tool_registry() -> Dict[str, Tool]:
         )
     ]
 
-    return {tool.name: tool for tool in tools}
+
+# Tools are immutable configuration, so build them once and hand out a
+# read-only view of the same mapping to every caller
+_LOCAL_TOOLS = MappingProxyType({tool.name: tool for tool in _build_local_tools()})
+
+
+def create_tool_registry() -> Mapping[str, Tool]:
+    """
+    Return the registry of available tools.
+
+    Returns:
+        Read-only mapping of tool names to Tool instances, shared by every
+        caller; copy it with dict() before adding or removing tools.
+    """
+    return _LOCAL_TOOLS